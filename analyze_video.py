@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import pickle
+
+from utils.inference import load_predictor
+from utils.video_analysis import analyze_video
+
+DEFAULT_MODELS = {
+    'keras': 'models/yoga_pose_dnn_model.h5',
+    'numpy': 'models/yoga_pose_dnn_model.npz',
+    'tflite': 'models/yoga_pose_dnn_model.tflite'
+}
+
+
+def format_time(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes):02d}:{seconds:05.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a pose timeline from a recorded yoga video")
+    parser.add_argument('video', help='Video file (mp4, avi, mov, mkv, webm)')
+    parser.add_argument('--backend', default='numpy', choices=['keras', 'numpy', 'tflite'])
+    parser.add_argument('--model', default=None, help='Model file (defaults by backend)')
+    parser.add_argument('--encoder', default='models/label_encoder_dnn.pkl')
+    parser.add_argument('--stride', type=int, default=2, help='Analyse every Nth frame')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes tracking separate parts of the video')
+    parser.add_argument('--batch-size', type=int, default=64, help='Frames per classifier forward pass')
+    parser.add_argument('--max-long-edge', type=int, default=640, help='Downscale frames to this long edge')
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--min-segment', type=float, default=1.0, help='Shorter segments are treated as flicker')
+    parser.add_argument('--output', default=None, help='Write the full report as JSON')
+    args = parser.parse_args()
+
+    model = load_predictor(args.backend, args.model or DEFAULT_MODELS[args.backend])
+    with open(args.encoder, 'rb') as f:
+        labels = pickle.load(f).classes_
+
+    report = analyze_video(
+        args.video, model.predict, labels,
+        stride=args.stride,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        max_long_edge=args.max_long_edge,
+        min_confidence=args.min_confidence,
+        min_segment_seconds=args.min_segment
+    )
+
+    print(f"\n{'start':>9}  {'end':>9}  {'confidence':>10}  pose")
+    for segment in report['segments']:
+        confidence = f"{segment['mean_confidence']:.2f}" if segment['mean_confidence'] is not None else '-'
+        print(f"{format_time(segment['start']):>9}  {format_time(segment['end']):>9}  {confidence:>10}  "
+              f"{segment['pose'] or '(no pose)'}")
+
+    print(f"\n{report['frames_sampled']} frames (stride {report['stride']}) of {report['duration_seconds']:.1f}s video "
+          f"in {report['processing_seconds']:.1f}s: {report['processing_fps']:.1f} frames/s, "
+          f"{report['realtime_factor']:.2f}x real time with {report['workers']} worker(s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,17 @@
 import os
-import cv2
 import numpy as np
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, send_from_directory, copy_current_request_context, Response
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash
-import tensorflow as tf
-from tensorflow.keras.models import load_model
 import pickle
-import google.generativeai as genai
 from dotenv import load_dotenv
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import base64
+import io
+import tempfile
 import json
 from datetime import datetime
 from bson.objectid import ObjectId
@@ -21,10 +20,33 @@ from bson.objectid import ObjectId
 from config import config
 from utils.database import db
 from utils.user import User, get_user_sessions
-from utils.pose_utils import PoseUtils
+from utils.pose_utils import PoseUtilsPool
+from utils.image_ingest import decode_image
+from utils.batch_predict import extract_image_landmarks, classify_rows, ResultFormatter
+from utils.video_analysis import analyze_video, read_video_info, sampled_frame_count, VIDEO_EXTENSIONS
+from utils.pose_sessions import PoseSessionPool
+from utils.landmark_workers import LandmarkWorkerPool, WorkerPoolFull, LandmarkExtractionError
+from utils.batching import MicroBatcher
+from utils.inference import load_predictor
+from utils.frame_stream import LatestFrameChannel
+from utils.pose_state import PoseStateEngine
 from services.tts_service import AdvancedIndianTTSSystem
+from services.audio_cache import AudioCache
+from services import audio_pack
+from services.content_cache import ContentCache
+from services.llm_client import create_llm_client
+from services.translation_memory import TranslationMemory
+from services.tts_scheduler import TTSScheduler, TTSQueueFull
+from services import pose_content
 from utils.user import log_user_activity, get_user_activity_stats, get_user_streak
 
+# WebSocket streaming is optional; the webcam page falls back to polling /predict without it
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+except ImportError:
+    Sock = None
+
 # Initialize Flask app with CORRECT paths
 app = Flask(__name__, 
            template_folder="app/templates", 
@@ -35,8 +57,8 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Configuration
 app.config.from_object(config['development'])
 
-# Initialize extensions
-db.init_app(app)
+# Initialize extensions (the database connects in init_services)
+sock = Sock(app) if Sock is not None else None
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'bmp'}
@@ -46,19 +68,81 @@ load_dotenv('.env')
 # Load model and utilities
 model = None
 le = None
-pose_utils = PoseUtils()
+batcher = None
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', 'YOUR_GEMINI_API_KEY_HERE')
-genai.configure(api_key=GEMINI_API_KEY)
-gemini_model = genai.GenerativeModel('gemini-2.5-flash')
+# Connections, caches and background threads; created by init_services() under __main__ so that
+# spawned landmark workers, which re-import this module, do not open them again
+pose_pool = None
+pose_sessions = None
+landmark_workers = None  # Started in __main__ when LANDMARK_WORKERS > 0
+llm_client = None
+content_cache = None
+tts_system = None
+tts_scheduler = None
 
-# Initialize TTS system
-tts_system = AdvancedIndianTTSSystem()
+# Totals across WebSocket prediction streams
+stream_stats = {'connections': 0, 'active': 0, 'frames_received': 0, 'frames_processed': 0, 'frames_dropped': 0}
+stream_stats_lock = threading.Lock()
+
+def init_services():
+    """Connect the database and create the pose graphs, LLM client, caches and TTS workers"""
+    global pose_pool, pose_sessions, llm_client, content_cache, tts_system, tts_scheduler
+    db.init_app(app)
+    
+    pose_pool = PoseUtilsPool(size=app.config['POSE_POOL_SIZE'])
+    pose_sessions = PoseSessionPool(
+        max_sessions=app.config['POSE_TRACKING_MAX_SESSIONS'],
+        idle_timeout=app.config['POSE_TRACKING_IDLE_SECONDS']
+    )
+    
+    # Gemini behind per-call deadlines and a circuit breaker, shared with the TTS system
+    llm_client = create_llm_client(
+        app.config['LLM_BACKEND'],
+        api_key=os.getenv('GEMINI_API_KEY'),
+        model_name=app.config['LLM_MODEL'],
+        default_timeout=app.config['GEMINI_TIMEOUT_SECONDS'],
+        failure_threshold=app.config['LLM_FAILURE_THRESHOLD'],
+        reset_seconds=app.config['LLM_RESET_SECONDS'],
+        max_concurrency=app.config['LLM_MAX_CONCURRENCY']
+    )
+    
+    # Generated pose instructions/feedback, keyed by (pose, language, prompt version)
+    content_cache = ContentCache(
+        app.config['CONTENT_CACHE_PATH'],
+        max_entries=app.config['CONTENT_CACHE_MAX_ENTRIES'],
+        ttl_seconds=app.config['CONTENT_CACHE_TTL_SECONDS']
+    )
+    
+    # Initialize TTS system
+    tts_system = AdvancedIndianTTSSystem(
+        llm_client,
+        translate_timeout=app.config['TTS_TRANSLATE_TIMEOUT_SECONDS'],
+        audio_cache=AudioCache(
+            app.config['AUDIO_CACHE_DIR'],
+            max_memory_bytes=app.config['AUDIO_CACHE_MEMORY_BYTES'],
+            max_disk_bytes=app.config['AUDIO_CACHE_DISK_BYTES']
+        ),
+        local_playback=False,  # audio is served to the browser from /tts_audio
+        audio_pack=audio_pack.AudioPack.load(app.config['AUDIO_PACK_PATH'] or audio_pack.PACK_PATH),
+        translation_memory=TranslationMemory(app.config['TRANSLATION_MEMORY_PATH'], batch_size=app.config['TRANSLATION_BATCH_SIZE'])
+    )
+    if app.config['TRANSLATION_PRELOAD_PATH']:
+        tts_system.translation_memory.preload(app.config['TRANSLATION_PRELOAD_PATH'])
+    
+    # Per-user TTS queues on a bounded worker pool; stale pose announcements are dropped before synthesis
+    tts_scheduler = TTSScheduler(workers=app.config['TTS_WORKERS'], max_pending=app.config['TTS_MAX_PENDING'])
 
 # Load asana data
 asana_data = None
 
+# Precomputed instructions/feedback/benefits per pose and language (see precompute_content.py)
+pose_content_bundle = {}
+
+def load_pose_content_bundle():
+    """Load the precomputed pose content bundle that matches the current prompt version"""
+    global pose_content_bundle
+    pose_content_bundle = pose_content.load_bundle(app.config['POSE_CONTENT_BUNDLE_PATH'] or pose_content.BUNDLE_PATH)
+
 def load_asana_data():
     """Load asana data from JSON file"""
     global asana_data
@@ -90,16 +174,39 @@ def cleanup_temp_files():
 
 def load_model_and_encoder():
     """Load the trained model and label encoder"""
-    global model, le
+    global model, le, batcher
     try:
-        model = load_model('models/yoga_pose_dnn_model.h5')
+        backend = app.config['INFERENCE_BACKEND']
+        model_paths = {
+            'keras': app.config['KERAS_MODEL_PATH'],
+            'numpy': app.config['NUMPY_MODEL_PATH'],  # Pure NumPy forward pass - TensorFlow is never imported
+            'tflite': app.config['TFLITE_MODEL_PATH']
+        }
+        model = load_predictor(backend, model_paths.get(backend), num_threads=app.config['TFLITE_NUM_THREADS'])
+        
+        if backend == 'keras':
+            # Trace the graph now so the first request after boot is not slower than the rest
+            warmup_sizes = [size for size in app.config['PREDICT_WARMUP_BATCH_SIZES']
+                            if size <= app.config['PREDICT_MAX_BATCH_SIZE']]
+            timings = model.warmup(warmup_sizes)
+            print("Model warm-up (ms per batch size): " +
+                  ", ".join(f"{size}: {ms:.1f}" for size, ms in timings.items()))
+        
         with open('models/label_encoder_dnn.pkl', 'rb') as f:
             le = pickle.load(f)
-        print("Model and encoder loaded successfully")
+        
+        # Concurrent /predict requests share batched forward passes
+        batcher = MicroBatcher(
+            model.predict,
+            max_batch_size=app.config['PREDICT_MAX_BATCH_SIZE'],
+            max_wait_ms=app.config['PREDICT_MAX_WAIT_MS']
+        )
+        print(f"Model ({backend} backend) and encoder loaded successfully")
     except Exception as e:
         print(f"Error loading model: {e}")
         model = None
         le = None
+        batcher = None
 
 # Traditional Sanskrit pose names mapping
 traditional_names = {
@@ -214,79 +321,35 @@ def get_pose_names(pose_name):
         'english': english_name
     }
 
+def get_pose_content(pose_name, language="en"):
+    """All generated content for a pose (instructions, feedback, benefits, contraindications, timing).
+    
+    Served from the precomputed bundle, then the content cache; otherwise one
+    structured Gemini call fills every field at once. Raises if none of these work.
+    """
+    traditional_name = get_traditional_name(pose_name)
+    if language not in pose_content.LANGUAGE_NAMES:
+        language = "en"
+    
+    # Precomputed bundle first; Gemini is only needed for poses/languages it does not cover
+    bundled = pose_content_bundle.get(pose_name, {}).get(language)
+    if bundled and all(bundled.get(field) for field in pose_content.CONTENT_FIELDS):
+        return bundled
+    
+    # Raises LLMUnavailable straight away while Gemini is down, so callers fall back fast. A burst of requests for a new pose shares one Gemini call; callers' fallbacks are never cached
+    return content_cache.get_or_create(
+        ContentCache.make_key(traditional_name, language, pose_content.PROMPT_VERSION),
+        lambda: pose_content.generate_pose_content(llm_client, traditional_name, language,
+                                                   app.config['GEMINI_TIMEOUT_SECONDS'])
+    )
+
 def get_pose_instructions_and_feedback(pose_name, language="en"):
-    """Get instructions and feedback for a yoga pose using Gemini API"""
+    """Get instructions and feedback for a yoga pose, from the content cache when possible"""
+    traditional_name = get_traditional_name(pose_name)
     try:
-        traditional_name = get_traditional_name(pose_name)
-        
-        if not gemini_model:
-            fallback_instructions = f"""
-            - Arms extended overhead
-            - Legs hip-width apart
-            - Head neutral
-            - Engage core
-            - Breathe steadily
-            """
-            fallback_feedback = f"Focus on your breathing and maintain steady alignment while performing {traditional_name}."
-            return fallback_instructions, fallback_feedback
-        
-        language_names = {
-            "en": "Indian English",
-            "hi": "Hindi",
-            "kn": "Kannada", 
-            "ta": "Tamil",
-            "te": "Telugu",
-            "mr": "Marathi"
-        }
-        
-        target_lang_name = language_names.get(language, "Indian English")
-        
-        instructions_prompt = f"""
-        Provide very brief, key-point instructions for the yoga pose: {traditional_name}
-        Language: {target_lang_name}
-        
-        Focus ONLY on the most essential elements:
-        - Arms position (up, down, extended, etc.)
-        - Legs position (straight, bent, apart, etc.) 
-        - Head position (neutral, looking up/down, etc.)
-        - Core engagement
-        - Breathing
-        
-        Format as simple bullet points. Keep each point under 8 words.
-        Make it suitable for text-to-speech - clear and concise.
-        
-        Example format:
-        - Arms extended overhead
-        - Legs hip-width apart
-        - Head neutral
-        - Engage core
-        - Breathe steadily
-        """
-        
-        feedback_prompt = f"""
-        Provide a very brief feedback tip for the yoga pose: {traditional_name}
-        Language: {target_lang_name}
-        
-        Give ONE key tip focusing on the most common mistake or important alignment point.
-        Keep it under 15 words and make it encouraging.
-        
-        Example: "Keep your spine straight and shoulders relaxed"
-        """
-        instructions_response = gemini_model.generate_content(instructions_prompt)
-        feedback_response = gemini_model.generate_content(feedback_prompt)
-        
-        instructions_text = instructions_response.text
-        feedback_text = feedback_response.text
-        
-        # Clean up the responses
-        if "INSTRUCTIONS:" in instructions_text:
-            instructions_text = instructions_text.split("INSTRUCTIONS:")[1].strip()
-        if "FEEDBACK:" in feedback_text:
-            feedback_text = feedback_text.split("FEEDBACK:")[1].strip()
-            
-        return instructions_text, feedback_text
-        
-          
+        content = get_pose_content(pose_name, language)
+        return content['instructions'], content['feedback']
+    
     except Exception as e:
         print(f"Error getting Gemini response: {e}")
         fallback_instructions = f"""
@@ -547,6 +610,179 @@ def logout():
 
 # ==================== YOGA POSE DETECTION ROUTES ====================
 
+def get_pose_session_key(session_id):
+    """Scope a client-generated webcam session id to the current user"""
+    owner = current_user.get_id() if current_user.is_authenticated else 'anonymous'
+    return f"{owner}:{session_id}"
+
+def start_landmark_workers():
+    """Start the landmark extraction worker processes if enabled in the config"""
+    global landmark_workers
+    if app.config['LANDMARK_WORKERS'] > 0:
+        landmark_workers = LandmarkWorkerPool(
+            num_workers=app.config['LANDMARK_WORKERS'],
+            queue_size=app.config['LANDMARK_QUEUE_SIZE'],
+            slot_bytes=app.config['LANDMARK_SLOT_BYTES'],
+            queue_timeout=app.config['LANDMARK_QUEUE_TIMEOUT'],
+            max_sessions=app.config['POSE_TRACKING_MAX_SESSIONS'],
+            idle_timeout=app.config['POSE_TRACKING_IDLE_SECONDS'],
+            max_long_edge=app.config['INGEST_MAX_LONG_EDGE']
+        ).start()
+
+def extract_frame_landmarks(file_bytes, session_id=None):
+    """Decode an uploaded image and return (landmarks, ingest info); landmarks is None if no pose was found"""
+    session_key = get_pose_session_key(session_id) if session_id else None
+    
+    if landmark_workers is not None:
+        # Decode + MediaPipe run in a worker process; only the 99 floats come back
+        return landmark_workers.extract(file_bytes, session_key), None
+    
+    # Reduced-resolution decode straight to RGB, so MediaPipe needs no further copy
+    image, info = decode_image(file_bytes, app.config['INGEST_MAX_LONG_EDGE'], to_rgb=True)
+    if image is None:
+        raise ValueError('Could not read image')
+    
+    # Webcam frames carry a session id and reuse that session's tracker between frames
+    if session_key:
+        with pose_sessions.session(session_key) as session:
+            landmarks, _ = session.pose_utils.extract_landmarks(image, is_rgb=True)
+    else:
+        with pose_pool.checkout() as pose_utils:
+            landmarks, _ = pose_utils.extract_landmarks(image, is_rgb=True)
+    return landmarks, info
+
+# Landmarks are normalised image coordinates; anything far outside this range is not a real pose
+LANDMARK_COUNT = 33
+LANDMARK_VALUE_LIMIT = 10.0
+
+def parse_landmarks(values):
+    """Validate a 33x3 (or flat 99) landmark array and return it as a flat float32 vector"""
+    try:
+        landmarks = np.asarray(values, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError('Landmarks must be numeric')
+    
+    if landmarks.size != LANDMARK_COUNT * 3 or landmarks.shape not in ((LANDMARK_COUNT, 3), (LANDMARK_COUNT * 3,)):
+        raise ValueError(f'Expected {LANDMARK_COUNT}x3 landmarks, got shape {list(landmarks.shape)}')
+    
+    landmarks = landmarks.reshape(-1)
+    if not np.isfinite(landmarks).all() or np.abs(landmarks).max() > LANDMARK_VALUE_LIMIT:
+        raise ValueError('Landmark values out of range')
+    return landmarks
+
+def log_completed_pose(session, session_id, completed):
+    """Log a pose the session's state engine has finished, if server-side logging is on"""
+    if not app.config['POSE_STATE_SERVER_LOGGING'] or completed is None or not current_user.is_authenticated:
+        return None
+    if completed['duration_seconds'] < app.config['POSE_STATE_MIN_HOLD_SECONDS']:
+        return None
+    
+    # Each hold is logged once; holding the same pose again later is a new hold
+    if completed['hold_id'] == session.last_logged_hold:
+        return None
+    
+    pose_name = le.inverse_transform([completed['pose_index']])[0]
+    
+    activity_id = log_user_activity(
+        current_user.id,
+        pose_name,
+        completed['avg_confidence'],
+        session_id=session_id,
+        duration_seconds=completed['duration_seconds']
+    )
+    if activity_id:
+        session.last_logged_hold = completed['hold_id']
+        print(f"Logged {pose_name} ({completed['duration_seconds']}s) from server-side pose state")
+    return activity_id
+
+def update_pose_state(session, session_id, prediction):
+    """Feed one prediction into the session's pose-state engine and return the state for the response"""
+    with session.lock:
+        if session.state is None:
+            session.state = PoseStateEngine(
+                len(prediction),
+                window=app.config['POSE_STATE_WINDOW'],
+                method=app.config['POSE_STATE_METHOD'],
+                alpha=app.config['POSE_STATE_ALPHA'],
+                enter_threshold=app.config['POSE_STATE_ENTER_THRESHOLD'],
+                exit_threshold=app.config['POSE_STATE_EXIT_THRESHOLD'],
+                min_frames=app.config['POSE_STATE_MIN_FRAMES']
+            )
+        state = session.state.update(prediction)
+    
+    log_completed_pose(session, session_id, state['completed'])
+    
+    held_pose = state['pose_index']
+    completed = state['completed']
+    return {
+        'pose': le.inverse_transform([held_pose])[0] if held_pose is not None else None,
+        'score': state['score'],
+        'stable': state['stable'],
+        'hold_seconds': state['hold_seconds'],
+        'event': state['event'],
+        'completed': {
+            'pose': le.inverse_transform([completed['pose_index']])[0],
+            'duration_seconds': completed['duration_seconds'],
+            'avg_confidence': completed['avg_confidence']
+        } if completed else None,
+        'server_logging': app.config['POSE_STATE_SERVER_LOGGING']
+    }
+
+def release_pose_session(session_id):
+    """Release a webcam session's trackers and log the pose it was still holding"""
+    session_key = get_pose_session_key(session_id)
+    if landmark_workers is not None:
+        landmark_workers.end_session(session_key)
+    
+    session = pose_sessions.end(session_key)
+    if session is not None and session.state is not None:
+        log_completed_pose(session, session_id, session.state.finish())
+    return session is not None
+
+def classify_landmarks(landmarks, session_id=None):
+    """Run the classifier on one landmark vector and build the prediction response.
+    
+    With a session_id the prediction also updates that session's smoothed
+    pose state, and frames that barely moved since the session's last
+    classified frame reuse its prediction instead of running the model.
+    """
+    session = pose_sessions.get(get_pose_session_key(session_id)) if session_id else None
+    
+    prediction = None
+    if session is not None and app.config['MOTION_GATE_THRESHOLD'] > 0:
+        with session.lock:
+            prediction = session.cached_prediction(
+                landmarks, app.config['MOTION_GATE_THRESHOLD'], app.config['MOTION_GATE_MAX_REUSE'])
+    cached = prediction is not None
+    
+    if not cached:
+        # Make prediction using only landmarks (batched with concurrent requests)
+        prediction, forward_ms = batcher.predict_timed(landmarks)
+        if session is not None:
+            with session.lock:
+                session.remember_prediction(landmarks, prediction, forward_ms)
+    class_idx = np.argmax(prediction)
+    confidence = prediction[class_idx]
+    pose_name = le.inverse_transform([class_idx])[0]
+    
+    # NOTE: DO NOT log activity here! The /api/log_activity endpoint handles logging
+    # with proper deduplication, confidence checks, and duration tracking.
+    # Logging here would create duplicate entries for every detection (every 1.5 seconds).
+    
+    # Get both Sanskrit and English names
+    pose_names = get_pose_names(pose_name)
+    
+    result = {
+        'pose': pose_name,
+        'sanskrit_name': pose_names['sanskrit'],
+        'english_name': pose_names['english'],
+        'confidence': float(confidence)
+    }
+    if session is not None:
+        result['cached'] = cached
+        result['state'] = update_pose_state(session, session_id, prediction)
+    return result
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Handle image upload and prediction"""
@@ -559,46 +795,283 @@ def predict():
     
     if file and allowed_file(file.filename):
         # Process image directly from memory without saving to disk
-        file_bytes = np.frombuffer(file.read(), np.uint8)
-        image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-        
-        if image is None:
-            return jsonify({'error': 'Could not read image'})
-        
         # Extract landmarks only (DNN model uses only landmarks)
-        landmarks, results = pose_utils.extract_landmarks(image)
+        try:
+            landmarks, image_info = extract_frame_landmarks(file.read(), request.form.get('session_id'))
+        except (WorkerPoolFull, TimeoutError):
+            return jsonify({'error': 'Server busy, please retry'}), 503
+        except LandmarkExtractionError as e:
+            return jsonify({'error': str(e)}), 503
+        except ValueError as e:
+            return jsonify({'error': str(e)})
+        
         if landmarks is None:
             return jsonify({'error': 'No pose detected in the image'})
         
-        # Prepare landmarks for prediction
-        landmarks = np.expand_dims(landmarks, axis=0)
-        
-        # Make prediction using only landmarks
-        prediction = model.predict(landmarks)
-        class_idx = np.argmax(prediction)
-        confidence = prediction[0][class_idx]
-        pose_name = le.inverse_transform([class_idx])[0]
-        
         # No need to save annotated image for real-time webcam processing
-        # Only save if specifically requested or for debugging
-        
-        # NOTE: DO NOT log activity here! The /api/log_activity endpoint handles logging
-        # with proper deduplication, confidence checks, and duration tracking.
-        # Logging here would create duplicate entries for every detection (every 1.5 seconds).
-        
-        # Get both Sanskrit and English names
-        pose_names = get_pose_names(pose_name)
-        
         # Return results without image_url since we're not saving files
-        return jsonify({
-            'pose': pose_name,
-            'sanskrit_name': pose_names['sanskrit'],
-            'english_name': pose_names['english'],
-            'confidence': float(confidence)
-        })
+        result = classify_landmarks(landmarks, request.form.get('session_id'))
+        if image_info:
+            result['image'] = image_info
+        return jsonify(result)
     
     return jsonify({'error': 'Invalid file type'})
 
+@app.route('/predict_landmarks', methods=['POST'])
+def predict_landmarks():
+    """Classify landmarks extracted on the client, skipping image decode and MediaPipe.
+    
+    Accepts JSON {"landmarks": [[x, y, z], ...]} (33x3 or flat 99) or a raw
+    application/octet-stream body of 99 little-endian float32 values. An
+    optional session_id (JSON field or query parameter) updates that
+    session's pose state.
+    """
+    session_id = request.args.get('session_id')
+    try:
+        if request.mimetype == 'application/octet-stream':
+            body = request.get_data(cache=False)
+            if len(body) != LANDMARK_COUNT * 3 * 4:
+                raise ValueError(f'Expected {LANDMARK_COUNT * 3 * 4} bytes of float32 landmarks, got {len(body)}')
+            landmarks = parse_landmarks(np.frombuffer(body, dtype='<f4'))
+        else:
+            data = request.get_json(silent=True) or {}
+            if 'landmarks' not in data:
+                return jsonify({'error': 'No landmarks provided'}), 400
+            landmarks = parse_landmarks(data['landmarks'])
+            session_id = data.get('session_id') or session_id
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(classify_landmarks(landmarks, session_id))
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """Classify many uploaded images and stream one result per image as JSON lines (or CSV with ?format=csv).
+    
+    Images are sent as repeated 'files' fields. Landmarks are extracted in
+    parallel and each chunk is classified in a single forward pass.
+    """
+    uploads = [f for f in request.files.getlist('files') if f.filename]
+    if not uploads:
+        return jsonify({'error': 'No files uploaded'}), 400
+    if len(uploads) > app.config['PREDICT_BATCH_MAX_FILES']:
+        return jsonify({'error': f"At most {app.config['PREDICT_BATCH_MAX_FILES']} files per request"}), 400
+    
+    try:
+        formatter = ResultFormatter(request.args.get('format', 'jsonl'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Read the uploads now; the request body is gone once the response starts streaming
+    images = [(f.filename, f.read()) for f in uploads]
+    batch_size = app.config['PREDICT_BATCH_SIZE']
+    max_long_edge = app.config['INGEST_MAX_LONG_EDGE']
+    
+    def extract(item):
+        filename, data = item
+        if not allowed_file(filename):
+            row = {'landmarks': None, 'error': 'Invalid file type'}
+        elif landmark_workers is not None:
+            start = time.perf_counter()
+            try:
+                landmarks = landmark_workers.extract(data)
+                row = {'landmarks': landmarks, 'error': None if landmarks is not None else 'No pose detected'}
+            except (WorkerPoolFull, TimeoutError):
+                row = {'landmarks': None, 'error': 'Server busy, please retry'}
+            except (ValueError, LandmarkExtractionError) as e:
+                row = {'landmarks': None, 'error': str(e)}
+            row['landmarks_ms'] = (time.perf_counter() - start) * 1000.0
+        else:
+            with pose_pool.checkout() as pose_utils:
+                row = extract_image_landmarks(pose_utils, data, max_long_edge)
+        row['file'] = filename
+        return row
+    
+    num_threads = landmark_workers.num_slots if landmark_workers is not None else pose_pool.size
+    
+    def generate():
+        yield formatter.header()
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            for offset in range(0, len(images), batch_size):
+                rows = list(executor.map(extract, images[offset:offset + batch_size]))
+                for row in classify_rows(rows, model.predict, le.classes_):
+                    yield formatter.format(row)
+    
+    return Response(generate(), mimetype=formatter.mimetype)
+
+@app.route('/analyze_video', methods=['POST'])
+@login_required
+def analyze_video_upload():
+    """Classify the poses in an uploaded class video and return a timeline of segments"""
+    if 'file' not in request.files or request.files['file'].filename == '':
+        return jsonify({'error': 'No file uploaded'}), 400
+    
+    file = request.files['file']
+    extension = file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else ''
+    if extension not in VIDEO_EXTENSIONS:
+        return jsonify({'error': 'Invalid video type'}), 400
+    
+    # VideoCapture needs a path, so spool the upload to a temporary file
+    fd, video_path = tempfile.mkstemp(suffix=f'.{extension}')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            file.save(f)
+        
+        # Analysis runs on the request thread, so refuse videos that would hold it for too long
+        stride = app.config['VIDEO_ANALYSIS_STRIDE']
+        max_frames = app.config['VIDEO_ANALYSIS_MAX_FRAMES']
+        fps, frame_count = read_video_info(video_path)
+        if frame_count <= 0:
+            return jsonify({'error': 'Could not determine the video length'}), 400
+        if sampled_frame_count(frame_count, stride) > max_frames:
+            return jsonify({'error': f"Video too long: at most {max_frames * stride / fps:.0f} seconds "
+                                     f"can be analysed"}), 413
+        
+        report = analyze_video(
+            video_path, model.predict, le.classes_,
+            stride=stride,
+            batch_size=app.config['VIDEO_ANALYSIS_BATCH_SIZE'],
+            max_long_edge=app.config['INGEST_MAX_LONG_EDGE'],
+            max_frames=max_frames
+        )
+    except ValueError:
+        return jsonify({'error': 'Could not read video'}), 400
+    finally:
+        os.remove(video_path)
+    
+    report['video'] = file.filename
+    print(f"Analysed video '{file.filename}': {report['frames_sampled']} frames, "
+          f"{report['processing_fps']} frames/s, {report['realtime_factor']}x real time")
+    return jsonify(report)
+
+def predict_stream_message(payload, session_id):
+    """Classify one streamed message: an encoded image, 99 float32 landmarks, or landmark JSON"""
+    try:
+        if isinstance(payload, str):
+            data = json.loads(payload)
+            if not isinstance(data, dict) or 'landmarks' not in data:
+                raise ValueError('No landmarks provided')
+            landmarks = parse_landmarks(data['landmarks'])
+        elif len(payload) == LANDMARK_COUNT * 3 * 4:
+            landmarks = parse_landmarks(np.frombuffer(payload, dtype='<f4'))
+        else:
+            landmarks, _ = extract_frame_landmarks(payload, session_id)
+    except (WorkerPoolFull, TimeoutError):
+        return {'error': 'Server busy, please retry'}
+    except (ValueError, LandmarkExtractionError) as e:
+        return {'error': str(e)}
+    
+    if landmarks is None:
+        return {'error': 'No pose detected in the image'}
+    return classify_landmarks(landmarks, session_id)
+
+def predict_stream(ws):
+    """Stream webcam frames over one WebSocket and push predictions back as they complete.
+    
+    Binary messages are encoded images or 396-byte float32 landmark packets,
+    text messages are {"landmarks": [...]} JSON. Only the newest pending frame
+    is processed; frames overtaken by a newer one are dropped.
+    """
+    if not current_user.is_authenticated:
+        ws.close(reason=1008, message='Login required')
+        return
+    
+    session_id = request.args.get('session_id')
+    channel = LatestFrameChannel()
+    
+    @copy_current_request_context
+    def process_frames():
+        while True:
+            frame = channel.get()
+            if frame is None:
+                return
+            seq, payload, received_at = frame
+            try:
+                result = predict_stream_message(payload, session_id)
+            except Exception as e:
+                # One bad frame must not silence the stream for the rest of the session
+                print(f"Error processing streamed frame {seq}: {e}")
+                result = {'error': 'Could not process frame'}
+            result['frame'] = seq
+            result['dropped'] = channel.dropped
+            result['latency_ms'] = round((time.perf_counter() - received_at) * 1000.0, 2)
+            try:
+                ws.send(json.dumps(result))
+            except ConnectionClosed:
+                channel.close()
+                return
+    
+    with stream_stats_lock:
+        stream_stats['connections'] += 1
+        stream_stats['active'] += 1
+    
+    processor = threading.Thread(target=process_frames, name='predict-stream', daemon=True)
+    processor.start()
+    try:
+        while processor.is_alive():
+            message = ws.receive(timeout=1)
+            if message is not None:
+                channel.put(message)
+        # The processor only exits on its own if sending failed; stop taking frames nobody will answer
+        ws.close()
+    except ConnectionClosed:
+        pass
+    finally:
+        channel.close()
+        processor.join(timeout=10)
+        
+        counts = channel.stats()
+        with stream_stats_lock:
+            stream_stats['active'] -= 1
+            stream_stats['frames_received'] += counts['received']
+            stream_stats['frames_processed'] += counts['processed']
+            stream_stats['frames_dropped'] += counts['dropped']
+        
+        # The socket only lives as long as the webcam session, so release its tracker too
+        if session_id:
+            release_pose_session(session_id)
+
+if sock is not None:
+    sock.route('/ws/predict')(predict_stream)
+
+@app.route('/end_pose_session', methods=['POST'])
+def end_pose_session():
+    """Release the pose tracker of a finished webcam session"""
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session_id')
+    if not session_id:
+        return jsonify({'error': 'No session id provided'}), 400
+    
+    released = release_pose_session(session_id)
+    return jsonify({'success': True, 'released': released})
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    """Report hit rates of the generated-content caches and synthesized audio, and the health of the LLM client"""
+    return jsonify({
+        'pose_content': content_cache.stats(),
+        'llm': llm_client.stats(),
+        'audio': tts_system.audio_cache.stats(),
+        'audio_pack': tts_system.audio_pack.stats() if tts_system.audio_pack is not None else None,
+        'translations': tts_system.translation_memory.stats()
+    })
+
+@app.route('/api/tts/stats')
+def tts_stats():
+    """Report TTS queue depth, coalescing and synthesis latency"""
+    return jsonify(tts_scheduler.stats())
+
+@app.route('/api/inference/stats')
+def inference_stats():
+    """Report micro-batching and pose tracking statistics"""
+    return jsonify({
+        'batcher': batcher.stats() if batcher is not None else None,
+        'pose_pool': pose_pool.stats(),
+        'pose_sessions': pose_sessions.stats(),
+        'landmark_workers': landmark_workers.stats() if landmark_workers is not None else None,
+        'streams': dict(stream_stats) if sock is not None else None
+    })
+
 @app.route('/get_instructions', methods=['POST'])
 def get_instructions():
     """Get instructions and feedback for a pose"""
@@ -615,6 +1088,43 @@ def get_instructions():
         'instructions': instructions,
         'feedback': feedback
     })
+
+@app.route('/get_pose_benefits', methods=['POST'])
+def get_pose_benefits():
+    """Get benefits, contraindications and timing for a pose"""
+    data = request.get_json()
+    pose_name = data.get('pose_name', '')
+    language = data.get('language', 'en')
+    
+    if not pose_name:
+        return jsonify({'error': 'No pose name provided'})
+    
+    traditional_name = get_traditional_name(pose_name)
+    timing_placeholder = f"Best timing for {traditional_name} will be displayed here"
+    
+    # Curated English entries in asana_data.json take priority over generated content
+    if language == 'en' and asana_data and pose_name in asana_data:
+        pose_info = asana_data[pose_name]
+        return jsonify({
+            'benefits': pose_content.format_bullets(pose_info.get('benefits', []), '•'),
+            'contraindications': pose_content.format_bullets(pose_info.get('warnings', []), '•'),
+            'timing': timing_placeholder
+        })
+    
+    try:
+        content = get_pose_content(pose_name, language)
+        return jsonify({
+            'benefits': pose_content.format_bullets(content['benefits'], '•'),
+            'contraindications': pose_content.format_bullets(content['contraindications'], '•'),
+            'timing': content.get('timing') or timing_placeholder
+        })
+    except Exception as e:
+        print(f"Error getting pose benefits: {e}")
+        return jsonify({
+            'benefits': f"Benefits for {traditional_name} will be displayed here",
+            'contraindications': f"Contraindications for {traditional_name} will be displayed here",
+            'timing': timing_placeholder
+        })
 #actual webcam application request handling
 @app.route('/webcam')
 @login_required
@@ -656,6 +1166,19 @@ def suryanamaskara():
     """Surya Namaskara practice page"""
     return render_template('suryanamaskara.html')
 
+def schedule_tts(kind, key, prepare):
+    """Run prepare() (returns an audio key) on the TTS scheduler for the current user; returns the JSON response"""
+    try:
+        ticket = tts_scheduler.submit(current_user.id, kind, key, prepare)
+        audio_key = tts_scheduler.wait(ticket, app.config['TTS_WAIT_SECONDS'])
+    except (TTSQueueFull, TimeoutError) as e:
+        print(f"TTS busy, skipping {kind}: {e}")
+        return jsonify({'success': False, 'message': 'Voice feedback is busy, try again'})
+    
+    if audio_key is None:
+        return jsonify({'success': False, 'superseded': True, 'message': 'Superseded by a newer announcement'})
+    return jsonify({'success': True, 'audio_url': url_for('tts_audio', key=audio_key)})
+
 @app.route('/speak_feedback', methods=['POST'])
 @login_required
 def speak_feedback():
@@ -669,13 +1192,9 @@ def speak_feedback():
         if not pose_name:
             return jsonify({'success': False, 'message': 'No pose name provided'})
         
-        # Use TTS system to speak
-        success = tts_system.speak_pose_feedback(pose_name, feedback, language)
-        
-        if success:
-            return jsonify({'success': True, 'message': 'Feedback spoken successfully'})
-        else:
-            return jsonify({'success': False, 'message': 'Failed to speak feedback'})
+        # The browser plays the audio; a newer announcement from this user supersedes this one
+        return schedule_tts('pose', ('pose', pose_name, language),
+                            lambda: tts_system.pose_feedback_audio(pose_name, feedback, language))
             
     except Exception as e:
         print(f"Error in speak_feedback: {e}")
@@ -689,18 +1208,27 @@ def speak_welcome():
         data = request.get_json()
         language = data.get('language', 'en')
         
-        # Use TTS system to speak welcome
-        success = tts_system.speak_welcome(language)
-        
-        if success:
-            return jsonify({'success': True, 'message': 'Welcome spoken successfully'})
-        else:
-            return jsonify({'success': False, 'message': 'Failed to speak welcome'})
+        return schedule_tts('welcome', ('welcome', language), lambda: tts_system.welcome_audio(language))
             
     except Exception as e:
         print(f"Error in speak_welcome: {e}")
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/tts_audio/<key>.mp3')
+def tts_audio(key):
+    """Serve synthesized speech by its content hash (supports Range and conditional requests)"""
+    if len(key) != 64 or any(ch not in '0123456789abcdef' for ch in key):
+        return jsonify({'error': 'Invalid audio key'}), 404
+    audio = tts_system.get_audio(key)
+    if audio is None:
+        return jsonify({'error': 'Audio not found'}), 404
+    
+    # The key is a hash of the text and voice, so the bytes behind a URL never change
+    response = send_file(io.BytesIO(audio), mimetype='audio/mpeg', conditional=True, etag=key, max_age=365 * 24 * 3600)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/set_language', methods=['POST'])
 @login_required
 def set_tts_language():
@@ -1236,11 +1764,16 @@ def cleanup_temp_files_route():
         return jsonify({'success': False, 'error': str(e)})
 
 if __name__ == '__main__':
+    # Start landmark workers before the model is loaded, so they come up alongside it
+    start_landmark_workers()
+    init_services()
+    
     # Load model before starting the server
     load_model_and_encoder()
     
     # Load asana data
     load_asana_data()
+    load_pose_content_bundle()
     
     # Create upload directory if it doesn't exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
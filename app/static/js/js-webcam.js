@@ -1,6 +1,8 @@
 // Global variables
 let stream = null;
 let loopHandle = null;
+let frameSocket = null;
+let serverLogsActivity = false; // Set when the server logs poses from its own session state
 let currentPose = null;
 let poseStartTime = null;
 let lastAnnouncedPose = null;
@@ -1410,7 +1412,17 @@ function formatAsBulletPoints(items) {
     return items.map(item => `• ${item}`).join('\n');
 }
 
-// Voice feedback functions - Using Google TTS (server-side)
+// Play server-synthesized speech; resolves when playback ends
+function playTtsAudio(audioUrl) {
+    return new Promise((resolve, reject) => {
+        const audio = new Audio(audioUrl);
+        audio.addEventListener('ended', resolve);
+        audio.addEventListener('error', () => reject(new Error('Audio playback failed')));
+        audio.play().catch(reject);
+    });
+}
+
+// Voice feedback functions - Using Google TTS (synthesized and cached on the server, played in the browser)
 async function speakPoseName(poseName, language = 'en') {
     if (isSpeaking || poseName === lastSpokenPose) {
         return; // Don't speak if already speaking or same pose
@@ -1443,17 +1455,14 @@ async function speakPoseName(poseName, language = 'en') {
         const data = await response.json();
         
         if (data.success) {
+            await playTtsAudio(data.audio_url);
             console.log('✅ Pose name spoken via Google TTS');
+        } else if (data.superseded) {
+            console.log('⏭️ Pose announcement superseded by a newer one');
         } else {
             console.error('❌ TTS failed:', data.message);
-            isSpeaking = false;
         }
-        
-        // Reset speaking flag after estimated audio duration
-        // Google TTS typically takes 1-3 seconds for pose names
-        setTimeout(() => {
-            isSpeaking = false;
-        }, 3000);
+        isSpeaking = false;
         
     } catch (error) {
         console.error('❌ Error calling TTS endpoint:', error);
@@ -1487,6 +1496,7 @@ async function speakWelcomeMessage(language = 'en') {
         const data = await response.json();
         
         if (data.success) {
+            await playTtsAudio(data.audio_url);
             console.log('✅ Welcome message spoken via Google TTS');
         } else {
             console.error('❌ Welcome TTS failed:', data.message);
@@ -1743,8 +1753,19 @@ async function captureAndPredict() {
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
 
     const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.7));
+
+    // Stream over the open socket; the server only processes the newest frame
+    if (frameSocket && frameSocket.readyState === WebSocket.OPEN) {
+        frameSocket.send(blob);
+        return;
+    }
+
     const form = new FormData();
     form.append('file', new File([blob], 'frame.jpg', { type: 'image/jpeg' }));
+    // Lets the server reuse this session's pose tracker between frames
+    if (sessionId) {
+        form.append('session_id', sessionId);
+    }
 
     try {
         const res = await fetch('/predict', { method: 'POST', body: form });
@@ -1756,7 +1777,18 @@ async function captureAndPredict() {
             return;
         }
         
-        const data = await res.json();
+        await handlePredictionResult(await res.json());
+    } catch (e) {
+        console.error('Error in captureAndPredict:', e);
+        handleTrackingLoss();
+    }
+}
+
+async function handlePredictionResult(data) {
+    try {
+        if (data.state) {
+            serverLogsActivity = Boolean(data.state.server_logging);
+        }
         
         // Check for errors in response
         if (data.error) {
@@ -1813,11 +1845,40 @@ async function captureAndPredict() {
         }
         
     } catch (e) {
-        console.error('Error in captureAndPredict:', e);
+        console.error('Error handling prediction:', e);
         handleTrackingLoss();
     }
 }
 
+// Open one WebSocket per webcam session; without it frames are POSTed to /predict
+function openFrameSocket() {
+    if (!('WebSocket' in window) || !sessionId) return;
+    
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${scheme}://${window.location.host}/ws/predict?session_id=${encodeURIComponent(sessionId)}`);
+    
+    socket.onmessage = async (event) => {
+        await handlePredictionResult(JSON.parse(event.data));
+    };
+    socket.onerror = () => {
+        console.warn('Prediction stream unavailable, falling back to HTTP');
+    };
+    socket.onclose = () => {
+        if (frameSocket === socket) {
+            frameSocket = null;
+        }
+    };
+    frameSocket = socket;
+}
+
+function closeFrameSocket() {
+    if (frameSocket) {
+        const socket = frameSocket;
+        frameSocket = null;
+        socket.close();
+    }
+}
+
 function generateSimulatedLandmarks(poseName, confidence) {
     // Generate simulated landmarks for testing
     // In a real implementation, these would come from MediaPipe pose detection
@@ -1837,6 +1898,7 @@ function startLoop() {
     poseStartTime = Date.now();
     lastAnnouncedPose = null;
     
+    openFrameSocket();
     captureAndPredict();
     loopHandle = setInterval(captureAndPredict, CAPTURE_MS);
 }
@@ -1846,6 +1908,7 @@ function stopLoop() {
         clearInterval(loopHandle);
         loopHandle = null;
     }
+    closeFrameSocket();
 }
 
 function resetUI() {
@@ -1946,6 +2009,7 @@ stopBtn.addEventListener('click', async () => {
         await logFinalPoseOnSessionEnd();
         
         await saveSessionData();
+        await endPoseSession();
         sessionActive = false;
         console.log('✅ Session ended and saved');
     } else {
@@ -2067,6 +2131,21 @@ stopBtn.disabled = true;
 
 
 
+// Release the server-side pose tracker for this session
+async function endPoseSession() {
+    if (!sessionId) return;
+    try {
+        await fetch('/end_pose_session', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ session_id: sessionId })
+        });
+    } catch (error) {
+        // The server evicts idle trackers on its own
+        console.warn('Could not release pose tracker:', error);
+    }
+}
+
 // Generate unique session ID
 function generateSessionId() {
     return 'session_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
@@ -2148,6 +2227,11 @@ async function logCurrentPoseBeforeExit() {
         return;
     }
     
+    // The server logs the held pose itself when the session's socket closes
+    if (serverLogsActivity) {
+        return;
+    }
+    
     const duration = poseStateManager.getDuration();
     const averageConfidence = poseStateManager.getAverageConfidence();
     
@@ -2281,6 +2365,11 @@ window.printSessionSummary = function() {
  * @returns {Promise<string|null>} Activity ID if logged, null if skipped
  */
 async function logPoseToDatabase(poseData) {
+    if (serverLogsActivity) {
+        console.log(`⏭️ Server logs poses for this session, skipping client log of ${poseData && poseData.name}`);
+        return null;
+    }
+    
     // Validate session is active
     if (!currentUserId || !sessionActive) {
         console.warn('⚠️ Cannot log pose: session not active or user not logged in');
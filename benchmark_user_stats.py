@@ -0,0 +1,172 @@
+import argparse
+import math
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient, monitoring
+
+from config import Config
+from utils.database import db
+from utils.user import get_user_activity_stats, get_traditional_name, compute_streak_from_history, get_user_streak
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server, i.e. round trips"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def legacy_activity_stats(user_id, days=30):
+    """The previous get_user_activity_stats: one query per statistic and per chart day"""
+    collection = db.db.user_activities
+    start_date = datetime.utcnow() - timedelta(days=days)
+    match = {'user_id': ObjectId(user_id), 'timestamp': {'$gte': start_date}}
+
+    total_asanas = collection.count_documents(match)
+    unique_asanas = collection.distinct('pose_name', match)
+    daily_activity = []
+    for i in range(7):
+        day = datetime.utcnow() - timedelta(days=i)
+        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
+        daily_activity.append(collection.count_documents(
+            {'user_id': ObjectId(user_id), 'timestamp': {'$gte': day_start, '$lte': day_end}}))
+    top_asanas = list(collection.aggregate([
+        {'$match': match},
+        {'$group': {'_id': '$pose_name', 'count': {'$sum': 1}, 'traditional_name': {'$first': '$traditional_name'},
+                    'last_practiced': {'$max': '$timestamp'}}},
+        {'$sort': {'count': -1}},
+        {'$limit': 5}
+    ]))
+    sessions = list(collection.aggregate([
+        {'$match': match},
+        {'$group': {'_id': '$session_id', 'asanas_count': {'$sum': 1}, 'total_duration': {'$sum': '$duration_seconds'},
+                    'session_date': {'$first': '$timestamp'}}},
+        {'$sort': {'session_date': -1}},
+        {'$limit': 10}
+    ]))
+    return total_asanas, len(unique_asanas), daily_activity, top_asanas, sessions
+
+
+def legacy_streak(user_id):
+    """The previous get_user_streak: one count per day, going back at most 30 days"""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    streak = 0
+    for i in range(30):
+        day_start = today - timedelta(days=i)
+        day_end = day_start.replace(hour=23, minute=59, second=59, microsecond=999999)
+        if not db.db.user_activities.count_documents(
+                {'user_id': ObjectId(user_id), 'timestamp': {'$gte': day_start, '$lte': day_end}}):
+            break
+        streak += 1
+    return streak
+
+
+def seed(users, activities_per_user, history_days, pose_names):
+    """Insert synthetic activity for `users` users; returns their ids"""
+    user_ids = [ObjectId() for _ in range(users)]
+    now = datetime.utcnow()
+    for user_id in user_ids:
+        docs = []
+        for i in range(activities_per_user):
+            pose_name = random.choice(pose_names)
+            docs.append({
+                'user_id': user_id,
+                'pose_name': pose_name,
+                'traditional_name': get_traditional_name(pose_name),
+                'confidence': random.uniform(0.6, 1.0),
+                'session_id': f"{user_id}-{i // 20}",
+                'duration_seconds': random.randint(5, 60),
+                'timestamp': now - timedelta(seconds=random.randint(0, history_days * 86400))
+            })
+        db.db.user_activities.insert_many(docs)
+    return user_ids
+
+
+def measure(name, fn, user_ids, repeats, counter):
+    timings = []
+    counter.count = 0
+    for _ in range(repeats):
+        for user_id in user_ids:
+            start = time.perf_counter()
+            fn(user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+    calls = len(timings)
+    timings.sort()
+    p95 = timings[math.ceil(0.95 * calls) - 1]  # nearest rank
+    print(f"{name:<28} {counter.count / calls:>11.1f} {statistics.median(timings):>10.2f} {p95:>10.2f}")
+    return statistics.median(timings), counter.count / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard statistics queries against a seeded MongoDB")
+    parser.add_argument('--uri', default='mongodb://localhost:27017')
+    parser.add_argument('--database', default='yoga_trainer_benchmark', help='Scratch database (dropped afterwards)')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--activities', type=int, default=2000, help='Activities per user')
+    parser.add_argument('--history-days', type=int, default=90)
+    parser.add_argument('--days', type=int, default=30, help='Stats period, as in /api/user/stats')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help='Keep the seeded database')
+    args = parser.parse_args()
+
+    if args.database == Config.DATABASE_NAME:
+        parser.error("Refusing to seed and drop the application database")
+    counter = CommandCounter()
+    client = MongoClient(args.uri, event_listeners=[counter])
+    db.client = client
+    db.db = client[args.database]
+    db.db.user_activities.drop()
+    db.db.users.drop()
+    db.create_indexes()
+
+    random.seed(42)
+    pose_names = ['Tree_Pose_or_Vrksasana_', 'Warrior_II_Pose_or_Virabhadrasana_II_', 'Cobra_Pose_or_Bhujangasana_',
+                  'Boat_Pose_or_Paripurna_Navasana_', 'Child_Pose_or_Balasana_', 'Chair_Pose_or_Utkatasana_',
+                  'Camel_Pose_or_Ustrasana_', 'Bow_Pose_or_Dhanurasana_']
+    start = time.perf_counter()
+    user_ids = [str(user_id) for user_id in seed(args.users, args.activities, args.history_days, pose_names)]
+    print(f"Seeded {args.users * args.activities} activities for {args.users} users "
+          f"in {time.perf_counter() - start:.1f}s\n")
+
+    # Warm up the cache and connection pool
+    for user_id in user_ids:
+        legacy_activity_stats(user_id, args.days)
+        get_user_activity_stats(user_id, args.days)
+
+    print(f"{'query':<28} {'round trips':>11} {'median ms':>10} {'p95 ms':>10}")
+    legacy_ms, legacy_trips = measure('legacy (11 queries)', lambda u: legacy_activity_stats(u, args.days),
+                                      user_ids, args.repeats, counter)
+    facet_ms, facet_trips = measure('single $facet', lambda u: get_user_activity_stats(u, args.days),
+                                    user_ids, args.repeats, counter)
+    print(f"\n{legacy_trips / facet_trips:.1f}x fewer round trips, {legacy_ms / facet_ms:.1f}x lower median latency\n")
+
+    print(f"{'streak':<28} {'round trips':>11} {'median ms':>10} {'p95 ms':>10}")
+    measure('legacy (per-day counts)', legacy_streak, user_ids, args.repeats, counter)
+    measure('distinct dates aggregation', compute_streak_from_history, user_ids, args.repeats, counter)
+    db.db.users.insert_many([{'_id': ObjectId(user_id), 'username': user_id, 'email': f"{user_id}@example.com"}
+                             for user_id in user_ids])
+    # Seeded users have no stored streak yet, so this first call backfills it from history
+    for user_id in user_ids:
+        get_user_streak(user_id)
+    measure('stored streak (O(1) read)', get_user_streak, user_ids, args.repeats, counter)
+
+    if not args.keep:
+        client.drop_database(args.database)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from precompute_content import with_retries
+from services import audio_pack
+from services.audio_cache import AudioCache
+from services.tts_service import AdvancedIndianTTSSystem, WELCOME_TEXT
+from utils.user import get_traditional_name
+
+# Step names of one Surya Namaskara round, in order (as on the Surya Namaskara page)
+SURYA_NAMASKARA_STEPS = [
+    'Pranamasana', 'Hastauttanasana', 'Hastapadasana', 'Ashwa Sanchalanasana',
+    'Dandasana', 'Ashtanga Namaskara', 'Bhujangasana', 'Adho Mukha Svanasana',
+    'Ashwa Sanchalanasana', 'Hastapadasana', 'Hastauttanasana', 'Pranamasana'
+]
+
+
+def pack_phrases(pose_names):
+    """Every fixed phrase the app speaks: the welcome message, pose announcements and Surya Namaskara steps"""
+    phrases = [WELCOME_TEXT]
+    phrases += [get_traditional_name(pose_name) for pose_name in pose_names]
+    phrases += SURYA_NAMASKARA_STEPS
+    return list(dict.fromkeys(phrases))
+
+
+def render_phrase(tts, text, language, retries):
+    """Translate (where the TTS system would) and synthesize one phrase; returns (key, mp3 bytes)"""
+    def render():
+        key = tts.prepare_audio(text, language)
+        return key, tts.get_audio(key)
+    return with_retries(render, retries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render every fixed TTS phrase into a versioned audio pack")
+    parser.add_argument('--encoder', default='models/label_encoder_dnn.pkl', help='Label encoder listing the pose classes')
+    parser.add_argument('--languages', nargs='+', default=None, help='Defaults to every language the TTS system supports')
+    parser.add_argument('--output', default=audio_pack.PACK_PATH, help='Pack path without extension (.bin and .json are written)')
+    parser.add_argument('--cache-dir', default='cache/audio', help='Audio cache reused between builds')
+    parser.add_argument('--concurrency', type=int, default=4, help='Parallel synthesis requests')
+    parser.add_argument('--retries', type=int, default=3)
+    args = parser.parse_args()
+
+    tts = AdvancedIndianTTSSystem(audio_cache=AudioCache(args.cache_dir), local_playback=False)
+    languages = args.languages or tts.get_available_languages()
+
+    with open(args.encoder, 'rb') as f:
+        pose_names = [str(name) for name in pickle.load(f).classes_]
+    phrases = pack_phrases(pose_names)
+    jobs = [(language, text) for language in languages for text in phrases]
+    print(f"{len(phrases)} phrases x {len(languages)} languages: {len(jobs)} entries to render")
+
+    # Translate everything up front in a few batched requests instead of one request per phrase
+    for language in languages:
+        if tts.needs_translation(language):
+            tts.translate_many(phrases, language)
+
+    rendered, failed = {}, []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {executor.submit(render_phrase, tts, text, language, args.retries): (language, text)
+                   for language, text in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            language, text = futures[future]
+            try:
+                rendered[(language, text)] = future.result()
+            except Exception as e:
+                failed.append((language, text))
+                print(f"[{done}/{len(jobs)}] FAILED {text} ({language}): {e}")
+                continue
+            print(f"[{done}/{len(jobs)}] {text} ({language})")
+
+    # Keep the job order so rebuilds of the same phrases produce the same file
+    entries = [(language, text) + rendered[(language, text)] for language, text in jobs if (language, text) in rendered]
+    manifest = audio_pack.write_pack(args.output, entries, tts.tld, tts.slow)
+    total_bytes = sum(length for _, length in manifest['audio'].values())
+    print(f"\nWrote '{args.output}.bin' and '{args.output}.json' in {time.perf_counter() - start:.1f}s: "
+          f"{len(entries)} phrases, {len(manifest['audio'])} audio files, {total_bytes / (1024 * 1024):.1f} MB, "
+          f"{len(failed)} failed")
+    if failed:
+        print("Re-run the same command to retry the failed phrases (rendered audio is reused from the cache)")
+
+
+if __name__ == "__main__":
+    main()
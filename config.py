@@ -12,6 +12,90 @@ class Config:
     # Security settings
     MAX_LOGIN_ATTEMPTS = 5
     LOCKOUT_TIME = 900
+    
+    # Inference settings - 'keras' loads the .h5 model, 'numpy' runs the exported .npz without TensorFlow,
+    # 'tflite' runs the converted .tflite model through the TFLite interpreter
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'keras')
+    KERAS_MODEL_PATH = os.environ.get('KERAS_MODEL_PATH', 'models/yoga_pose_dnn_model.h5')
+    NUMPY_MODEL_PATH = os.environ.get('NUMPY_MODEL_PATH', 'models/yoga_pose_dnn_model.npz')
+    TFLITE_MODEL_PATH = os.environ.get('TFLITE_MODEL_PATH', 'models/yoga_pose_dnn_model.tflite')
+    TFLITE_NUM_THREADS = int(os.environ.get('TFLITE_NUM_THREADS', os.cpu_count() or 1))
+    
+    # /predict requests are grouped into batched forward passes
+    PREDICT_MAX_BATCH_SIZE = int(os.environ.get('PREDICT_MAX_BATCH_SIZE', 32))
+    PREDICT_MAX_WAIT_MS = float(os.environ.get('PREDICT_MAX_WAIT_MS', 5))
+    PREDICT_WARMUP_BATCH_SIZES = (1, 2, 4, 8, 16, 32)
+    
+    # Pool of MediaPipe graphs shared by request threads (defaults to one per CPU core)
+    POSE_POOL_SIZE = int(os.environ.get('POSE_POOL_SIZE', os.cpu_count() or 1))
+    
+    # Per-session MediaPipe trackers for webcam frames
+    POSE_TRACKING_MAX_SESSIONS = int(os.environ.get('POSE_TRACKING_MAX_SESSIONS', 32))
+    POSE_TRACKING_IDLE_SECONDS = int(os.environ.get('POSE_TRACKING_IDLE_SECONDS', 60))
+    
+    # Optional worker processes for JPEG decode + landmark extraction (0 keeps it in the web process)
+    LANDMARK_WORKERS = int(os.environ.get('LANDMARK_WORKERS', 0))
+    LANDMARK_QUEUE_SIZE = int(os.environ.get('LANDMARK_QUEUE_SIZE', 8))
+    LANDMARK_QUEUE_TIMEOUT = float(os.environ.get('LANDMARK_QUEUE_TIMEOUT', 0.05))
+    LANDMARK_SLOT_BYTES = int(os.environ.get('LANDMARK_SLOT_BYTES', 4 * 1024 * 1024))
+    
+    # Uploaded frames are decoded no larger than this (MediaPipe works on 256px crops anyway)
+    INGEST_MAX_LONG_EDGE = int(os.environ.get('INGEST_MAX_LONG_EDGE', 640))
+    
+    # Server-side pose state per webcam session: smoothing ('ema' or 'majority') with hysteresis
+    POSE_STATE_METHOD = os.environ.get('POSE_STATE_METHOD', 'ema')
+    POSE_STATE_WINDOW = int(os.environ.get('POSE_STATE_WINDOW', 8))
+    POSE_STATE_ALPHA = float(os.environ.get('POSE_STATE_ALPHA', 0.3))
+    POSE_STATE_ENTER_THRESHOLD = float(os.environ.get('POSE_STATE_ENTER_THRESHOLD', 0.85))
+    POSE_STATE_EXIT_THRESHOLD = float(os.environ.get('POSE_STATE_EXIT_THRESHOLD', 0.6))
+    POSE_STATE_MIN_FRAMES = int(os.environ.get('POSE_STATE_MIN_FRAMES', 2))
+    POSE_STATE_MIN_HOLD_SECONDS = float(os.environ.get('POSE_STATE_MIN_HOLD_SECONDS', 2))
+    # Log completed poses from the server's own state instead of trusting /api/log_activity calls
+    POSE_STATE_SERVER_LOGGING = os.environ.get('POSE_STATE_SERVER_LOGGING', 'false').lower() == 'true'
+    
+    # Reuse a session's last prediction while its landmarks move less than this (fraction of pose size; 0 disables)
+    MOTION_GATE_THRESHOLD = float(os.environ.get('MOTION_GATE_THRESHOLD', 0.02))
+    MOTION_GATE_MAX_REUSE = int(os.environ.get('MOTION_GATE_MAX_REUSE', 10))
+    
+    # /predict_batch: files per request and images per classifier forward pass
+    PREDICT_BATCH_MAX_FILES = int(os.environ.get('PREDICT_BATCH_MAX_FILES', 500))
+    PREDICT_BATCH_SIZE = int(os.environ.get('PREDICT_BATCH_SIZE', 256))
+    
+    # /analyze_video: analyse every Nth frame, classify in batches of this size
+    VIDEO_ANALYSIS_STRIDE = int(os.environ.get('VIDEO_ANALYSIS_STRIDE', 2))
+    VIDEO_ANALYSIS_BATCH_SIZE = int(os.environ.get('VIDEO_ANALYSIS_BATCH_SIZE', 64))
+    # Uploads needing more sampled frames than this are rejected (413) instead of tying up a worker
+    VIDEO_ANALYSIS_MAX_FRAMES = int(os.environ.get('VIDEO_ANALYSIS_MAX_FRAMES', 9000))
+    
+    # LLM client: 'gemini' or 'fake' (offline canned responses), per-call deadlines and circuit breaker
+    LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini')
+    LLM_MODEL = os.environ.get('LLM_MODEL', 'gemini-2.5-flash')
+    GEMINI_TIMEOUT_SECONDS = float(os.environ.get('GEMINI_TIMEOUT_SECONDS', 20))
+    TTS_TRANSLATE_TIMEOUT_SECONDS = float(os.environ.get('TTS_TRANSLATE_TIMEOUT_SECONDS', 5))
+    LLM_FAILURE_THRESHOLD = int(os.environ.get('LLM_FAILURE_THRESHOLD', 3))  # consecutive failures before the circuit opens
+    LLM_RESET_SECONDS = float(os.environ.get('LLM_RESET_SECONDS', 30))  # open time before a half-open probe
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))
+    # Gemini pose content: in-memory LRU in front of a SQLite store
+    CONTENT_CACHE_PATH = os.environ.get('CONTENT_CACHE_PATH', 'cache/pose_content.sqlite3')
+    CONTENT_CACHE_MAX_ENTRIES = int(os.environ.get('CONTENT_CACHE_MAX_ENTRIES', 512))
+    CONTENT_CACHE_TTL_SECONDS = int(os.environ.get('CONTENT_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    # Precomputed content written by precompute_content.py (defaults to the bundle for the current prompt version)
+    POSE_CONTENT_BUNDLE_PATH = os.environ.get('POSE_CONTENT_BUNDLE_PATH')
+    
+    # Synthesized TTS audio: in-memory LRU of MP3 bytes in front of a size-capped directory
+    AUDIO_CACHE_DIR = os.environ.get('AUDIO_CACHE_DIR', 'cache/audio')
+    AUDIO_CACHE_MEMORY_BYTES = int(os.environ.get('AUDIO_CACHE_MEMORY_BYTES', 32 * 1024 * 1024))
+    AUDIO_CACHE_DISK_BYTES = int(os.environ.get('AUDIO_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+    # TTS scheduler: synthesis workers, max queued jobs, and how long a request waits for its audio
+    TTS_WORKERS = int(os.environ.get('TTS_WORKERS', 4))
+    TTS_MAX_PENDING = int(os.environ.get('TTS_MAX_PENDING', 256))
+    TTS_WAIT_SECONDS = float(os.environ.get('TTS_WAIT_SECONDS', 15))
+    # TTS translations shared by all worker processes; optional {language: {text: translation}} file loaded at startup
+    TRANSLATION_MEMORY_PATH = os.environ.get('TRANSLATION_MEMORY_PATH', 'cache/translations.sqlite3')
+    TRANSLATION_PRELOAD_PATH = os.environ.get('TRANSLATION_PRELOAD_PATH')
+    TRANSLATION_BATCH_SIZE = int(os.environ.get('TRANSLATION_BATCH_SIZE', 50))
+    # Pre-rendered phrases written by build_audio_pack.py (defaults to the pack for the current pack version)
+    AUDIO_PACK_PATH = os.environ.get('AUDIO_PACK_PATH')
 
 class DevelopmentConfig(Config):
     DEBUG = True
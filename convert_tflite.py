@@ -0,0 +1,173 @@
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from utils.inference import KerasPredictor, TFLitePredictor
+
+
+def load_landmark_data(data_path):
+    """Load stored landmark data written by training_dnn.py (X_test / y_test preferred).
+
+    Hybrid models also need the matching images: 'images_test' alongside X_test, or 'images' alongside X.
+    """
+    with np.load(data_path, allow_pickle=True) as data:
+        split = '_test' if 'X_test' in data else ''
+        X = data['X' + split]
+        y = data['y' + split] if 'y' + split in data else None
+        images = data['images' + split] if 'images' + split in data else None
+    return X.astype(np.float32), y, images
+
+
+def needs_images(model):
+    """Whether the model has an image input besides the landmark vector"""
+    return any(len(model_input.shape) != 2 for model_input in model.inputs)
+
+
+def model_inputs(model, landmarks, images=None):
+    """Arrange the landmark and image arrays in the order of model.inputs"""
+    inputs = []
+    for model_input in model.inputs:
+        if len(model_input.shape) == 2:
+            inputs.append(landmarks)
+        else:
+            if images is None:
+                raise ValueError("This model takes image input, but the data file has no matching 'images' array")
+            inputs.append(images.astype(np.float32))
+    return inputs
+
+
+def representative_dataset(model, landmarks, images=None, num_samples=200):
+    """Yield single-sample calibration inputs in the order of model.inputs"""
+    inputs = model_inputs(model, landmarks, images)
+    rng = np.random.default_rng(0)
+    indices = rng.permutation(len(landmarks))[:num_samples]
+
+    def generator():
+        for i in indices:
+            yield [x[i:i + 1] for x in inputs]
+
+    return generator
+
+
+def convert_model(model_path, output_path, quantize='none', data_path=None, num_calibration=200):
+    """Convert a Keras .h5 model (DNN or hybrid) to .tflite"""
+    model = load_model(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantize == 'dynamic':
+        # Weights stored as int8, activations stay float
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif quantize == 'int8':
+        if not data_path:
+            raise ValueError("Full-int8 quantization needs --data for calibration")
+        landmarks, _, images = load_landmark_data(data_path)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset(model, landmarks, images, num_calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    tflite_model = converter.convert()
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+
+    print(f"Saved '{output_path}' ({len(tflite_model) / 1024:.1f} KB, quantization: {quantize})")
+    return output_path
+
+
+def latency_ms(predict_fn, x, repeats=200):
+    """Return p50 and p99 latency in milliseconds"""
+    predict_fn(x)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_fn(x)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def predict_all(predictor, inputs, batch_size=64):
+    """Predict a whole dataset in batches (image inputs are too large for one call)"""
+    outputs = []
+    for start in range(0, len(inputs[0]), batch_size):
+        batch = [x[start:start + batch_size] for x in inputs]
+        outputs.append(predictor.predict(batch if len(batch) > 1 else batch[0]))
+    return np.concatenate(outputs)
+
+
+def compare_models(model_path, tflite_paths, data_path, encoder_path, num_threads=None):
+    """Compare accuracy and latency of .tflite models against the .h5 model on the stored test data.
+
+    Hybrid models are fed the data file's images alongside the landmarks.
+    """
+    X, y, images = load_landmark_data(data_path)
+
+    labels = None
+    if y is not None:
+        labels = np.asarray(y)
+        if labels.dtype.kind in ('U', 'S', 'O'):
+            with open(encoder_path, 'rb') as f:
+                le = pickle.load(f)
+            labels = le.transform(labels)
+
+    model = load_model(model_path)
+    inputs = model_inputs(model, X, images)
+    first = [x[:1] for x in inputs]
+    first = first if len(first) > 1 else first[0]
+
+    backends = {os.path.basename(model_path): KerasPredictor(model)}
+    for path in tflite_paths:
+        backends[os.path.basename(path)] = TFLitePredictor(path, num_threads=num_threads)
+
+    reference = predict_all(backends[os.path.basename(model_path)], inputs).argmax(axis=1)
+
+    print(f"\n{'model':<40}{'accuracy':>10}{'agree':>9}{'p50 ms':>9}{'p99 ms':>9}{'size KB':>10}")
+    for name, predictor in backends.items():
+        predicted = predict_all(predictor, inputs).argmax(axis=1)
+        accuracy = f"{np.mean(predicted == labels) * 100:.2f}%" if labels is not None else 'n/a'
+        agreement = np.mean(predicted == reference) * 100
+        p50, p99 = latency_ms(predictor.predict, first)
+        path = model_path if name == os.path.basename(model_path) else next(p for p in tflite_paths if os.path.basename(p) == name)
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{name:<40}{accuracy:>10}{agreement:>8.2f}%{p50:>9.3f}{p99:>9.3f}{size_kb:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert pose models to TFLite and compare them with the .h5 originals")
+    parser.add_argument('--model', default='models/yoga_pose_dnn_model.h5', help='Keras .h5 model (DNN or hybrid)')
+    parser.add_argument('--quantize', nargs='+', default=['none', 'dynamic'], choices=['none', 'dynamic', 'int8'],
+                        help='Variants to produce')
+    parser.add_argument('--data', default='models/landmark_data_dnn.npz',
+                        help='Stored landmark data (.npz, with matching images for hybrid models) '
+                             'used for int8 calibration and comparison')
+    parser.add_argument('--encoder', default='models/label_encoder_dnn.pkl')
+    parser.add_argument('--num-calibration', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=None, help='TFLite interpreter thread count')
+    parser.add_argument('--compare', action='store_true', help='Report accuracy and latency against the .h5 model')
+    args = parser.parse_args()
+
+    base, _ = os.path.splitext(args.model)
+    data_path = args.data if os.path.exists(args.data) else None
+
+    # Refuse up front rather than writing models that cannot be checked against the original
+    if args.compare:
+        if data_path is None:
+            parser.error(f"Cannot compare: landmark data '{args.data}' not found (run training_dnn.py to create it)")
+        if load_landmark_data(data_path)[2] is None and needs_images(load_model(args.model)):
+            parser.error(f"'{args.model}' takes image input, but '{args.data}' has no matching images array "
+                         f"to compare the converted models with")
+
+    outputs = []
+    for quantize in args.quantize:
+        suffix = '' if quantize == 'none' else f'_{quantize}'
+        outputs.append(convert_model(args.model, f"{base}{suffix}.tflite", quantize, data_path, args.num_calibration))
+
+    if args.compare:
+        compare_models(args.model, outputs, data_path, args.encoder, num_threads=args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from utils.inference import read_dense_layers_h5, export_dense_layers_npz, NumpyDNN, KerasPredictor
+
+
+def make_sample_landmarks(num_samples, input_dim=99, seed=0):
+    """Random landmark-like vectors (x, y in [0, 1], small z) for checking and timing"""
+    rng = np.random.default_rng(seed)
+    samples = rng.uniform(0.0, 1.0, size=(num_samples, input_dim)).astype(np.float32)
+    samples[:, 2::3] = rng.normal(0.0, 0.3, size=(num_samples, input_dim // 3))
+    return samples
+
+
+def time_call(fn, x, repeats):
+    """Return p50 and p99 latency in milliseconds for fn(x)"""
+    fn(x)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(x)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def verify_against_keras(model_path, engine, samples):
+    """Compare NumPy outputs with the Keras model and print a latency table"""
+    from tensorflow.keras.models import load_model
+
+    keras_model = load_model(model_path)
+    keras_probs = keras_model.predict(samples, verbose=0)
+    numpy_probs = engine.predict(samples)
+
+    max_diff = float(np.abs(keras_probs - numpy_probs).max())
+    agreement = float(np.mean(keras_probs.argmax(axis=1) == numpy_probs.argmax(axis=1)))
+    print(f"\nMax |keras - numpy| probability difference: {max_diff:.2e}")
+    print(f"Top-1 agreement with Keras: {agreement * 100:.2f}% over {len(samples)} samples")
+
+    compiled = KerasPredictor(keras_model)
+    compiled.warmup()
+
+    backends = {
+        'keras model.predict': lambda x: keras_model.predict(x, verbose=0),
+        'keras model(x)': lambda x: keras_model(x, training=False),
+        'keras tf.function': compiled.predict,
+        'numpy': engine.predict
+    }
+
+    print(f"\n{'backend':<22}{'batch':>7}{'p50 ms':>10}{'p99 ms':>10}")
+    for batch_size in (1, 32):
+        x = samples[:batch_size]
+        for name, fn in backends.items():
+            repeats = 20 if name == 'keras model.predict' else 200
+            p50, p99 = time_call(fn, x, repeats)
+            print(f"{name:<22}{batch_size:>7}{p50:>10.3f}{p99:>10.3f}")
+
+    return max_diff, agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the landmark DNN to a NumPy .npz bundle")
+    parser.add_argument('--model', default='models/yoga_pose_dnn_model.h5', help='Keras .h5 model to export')
+    parser.add_argument('--output', default='models/yoga_pose_dnn_model.npz', help='Destination .npz file')
+    parser.add_argument('--precision', default='float32', choices=['float32', 'float16', 'int8'],
+                        help='Storage precision for the kernels')
+    parser.add_argument('--verify', action='store_true',
+                        help='Compare against the Keras model and report latency (requires TensorFlow)')
+    parser.add_argument('--samples', default=None,
+                        help='Optional .npy file of landmark vectors to verify with (random samples otherwise)')
+    parser.add_argument('--num-samples', type=int, default=1000)
+    args = parser.parse_args()
+
+    dense_layers = read_dense_layers_h5(args.model)
+    export_dense_layers_npz(dense_layers, args.output, precision=args.precision)
+
+    engine = NumpyDNN.load(args.output)
+    print(f"Exported {len(dense_layers)} Dense layers to '{args.output}' "
+          f"({os.path.getsize(args.output) / 1024:.1f} KB, {args.precision})")
+    print(f"Input dim: {engine.input_dim}, classes: {engine.num_classes}")
+
+    if args.verify:
+        if args.samples:
+            samples = np.load(args.samples).astype(np.float32)
+        else:
+            samples = make_sample_landmarks(args.num_samples, engine.input_dim)
+        verify_against_keras(args.model, engine, samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from services import pose_content
+from utils.user import get_traditional_name
+
+
+def with_retries(fn, retries=3, base_delay=2.0):
+    """Call fn, retrying with exponential backoff and jitter on any exception"""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = base_delay * (2 ** attempt) * (0.5 + random.random())
+            print(f"  retrying in {delay:.1f}s after error: {e}")
+            time.sleep(delay)
+
+
+def generate_entry(model, traditional_name, language, retries, timeout):
+    """Generate every content field for one pose and language with a single structured request"""
+    return with_retries(
+        lambda: pose_content.generate_pose_content(model, traditional_name, language, timeout), retries)
+
+
+def write_bundle(path, poses, model_name):
+    """Write the bundle atomically so the app never reads a half-written file"""
+    bundle = {
+        'prompt_version': pose_content.PROMPT_VERSION,
+        'model': model_name,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'languages': sorted(pose_content.LANGUAGE_NAMES),
+        'poses': poses
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute Gemini pose content for every class and language")
+    parser.add_argument('--encoder', default='models/label_encoder_dnn.pkl', help='Label encoder listing the pose classes')
+    parser.add_argument('--languages', nargs='+', default=sorted(pose_content.LANGUAGE_NAMES),
+                        choices=sorted(pose_content.LANGUAGE_NAMES))
+    parser.add_argument('--output', default=pose_content.BUNDLE_PATH)
+    parser.add_argument('--model', default='gemini-2.5-flash')
+    parser.add_argument('--concurrency', type=int, default=4, help='Parallel Gemini requests')
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds allowed per Gemini request')
+    parser.add_argument('--refresh', action='store_true', help='Regenerate entries already in the output bundle')
+    args = parser.parse_args()
+
+    load_dotenv('.env')
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        print("GEMINI_API_KEY is not set")
+        return
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel(args.model)
+
+    with open(args.encoder, 'rb') as f:
+        pose_names = [str(name) for name in pickle.load(f).classes_]
+
+    # Resume from an existing bundle for the same prompt version
+    poses = {} if args.refresh else pose_content.load_bundle(args.output)
+    jobs = [(pose_name, language) for pose_name in pose_names for language in args.languages
+            if not all(poses.get(pose_name, {}).get(language, {}).get(field) for field in pose_content.CONTENT_FIELDS)]
+    print(f"{len(pose_names)} poses x {len(args.languages)} languages: {len(jobs)} entries to generate")
+
+    failed = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {
+            executor.submit(generate_entry, model, get_traditional_name(pose_name), language, args.retries, args.timeout): (pose_name, language)
+            for pose_name, language in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            pose_name, language = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                failed.append((pose_name, language))
+                print(f"[{done}/{len(jobs)}] FAILED {pose_name} ({language}): {e}")
+                continue
+
+            poses.setdefault(pose_name, {})[language] = entry
+            # Checkpoint regularly so an interrupted run can resume
+            if done % 25 == 0:
+                write_bundle(args.output, poses, args.model)
+            print(f"[{done}/{len(jobs)}] {pose_name} ({language})")
+
+    write_bundle(args.output, poses, args.model)
+    print(f"\nWrote '{args.output}' in {time.perf_counter() - start:.1f}s: "
+          f"{sum(len(languages) for languages in poses.values())} entries, {len(failed)} failed")
+    if failed:
+        print("Re-run the same command to retry the failed entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
+import argparse
+import sys
+import time
 import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import load_model
 import mediapipe as mp
 import pickle
+from utils.inference import load_predictor
+from utils.batch_predict import expand_inputs, iter_batch_results, ResultFormatter
 
 class YogaPosePredictor:
-    def __init__(self, model_path, encoder_path, use_hybrid=True):
-        self.model = load_model(model_path)
+    def __init__(self, model_path, encoder_path, use_hybrid=True, backend='keras', num_threads=None):
+        # 'keras' loads an .h5 model, 'tflite' runs a converted .tflite model (see convert_tflite.py),
+        # 'numpy' a DNN exported with export_numpy_model.py
+        self.model = load_predictor(backend, model_path, num_threads=num_threads)
         with open(encoder_path, 'rb') as f:
             self.le = pickle.load(f)
         self.use_hybrid = use_hybrid
@@ -32,6 +37,8 @@ class YogaPosePredictor:
     
     def preprocess_image(self, image, target_size=(224, 224)):
         """Preprocess image for EfficientNet"""
+        import tensorflow as tf
+        
         img = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         img = cv2.resize(img, target_size)
         img = tf.keras.applications.efficientnet.preprocess_input(img)
@@ -52,7 +59,7 @@ class YogaPosePredictor:
             processed_image = self.preprocess_image(image)
             landmarks = np.expand_dims(landmarks, axis=0)
             
-            prediction = self.model.predict([processed_image, landmarks])
+            prediction = self.model.predict([processed_image.astype(np.float32), landmarks])
         else:
             # DNN model prediction
             landmarks = self.extract_landmarks(image)
@@ -68,23 +75,73 @@ class YogaPosePredictor:
         
         return class_name, confidence
 
-# Example usage
-if __name__ == "__main__":
-    # # For hybrid model
-    # predictor = YogaPosePredictor(
-    #     "models/yoga_pose_hybrid_model.h5", 
-    #     "models/label_encoder.pkl",
-    #     use_hybrid=True
-    # )
+def predict_batch(inputs, model_path, encoder_path, backend='keras', output=None, fmt=None,
+                  workers=None, batch_size=256, max_long_edge=640, num_threads=None):
+    """Classify every image in the given directories / globs with the landmark DNN and stream the results"""
+    paths = expand_inputs(inputs)
+    if not paths:
+        print("No images found")
+        return 0
+    
+    if fmt is None:
+        fmt = 'csv' if output and output.lower().endswith('.csv') else 'jsonl'
+    formatter = ResultFormatter(fmt)
     
-    #For DNN model
-    predictor = YogaPosePredictor(
-        "models/yoga_pose_dnn_model.h5", 
-        "models/label_encoder_dnn.pkl",
-        use_hybrid=False
-    )
+    model = load_predictor(backend, model_path, num_threads=num_threads)
+    with open(encoder_path, 'rb') as f:
+        labels = pickle.load(f).classes_
     
-    # Test prediction
-    image_path = "test_image.jpg"  # Replace with your test image path
-    pose, confidence = predictor.predict(image_path)
-    print(f"Predicted pose: {pose} with confidence: {confidence:.4f}")
\ No newline at end of file
+    out = open(output, 'w', newline='') if output else sys.stdout
+    start = time.perf_counter()
+    counts = {'ok': 0, 'failed': 0}
+    try:
+        out.write(formatter.header())
+        for row in iter_batch_results(paths, model.predict, labels, workers=workers,
+                                      batch_size=batch_size, max_long_edge=max_long_edge):
+            out.write(formatter.format(row))
+            counts['failed' if row['error'] else 'ok'] += 1
+        out.flush()
+    finally:
+        if output:
+            out.close()
+    
+    elapsed = time.perf_counter() - start
+    print(f"Classified {counts['ok']} of {len(paths)} images ({counts['failed']} failed) in {elapsed:.1f}s "
+          f"({len(paths) / elapsed:.1f} images/s)", file=sys.stderr)
+    return counts['ok']
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify yoga poses in a single image or in whole folders")
+    parser.add_argument('inputs', nargs='+', help='Image files, directories or glob patterns')
+    parser.add_argument('--backend', default='keras', choices=['keras', 'numpy', 'tflite'])
+    parser.add_argument('--model', default=None,
+                        help='Model file (defaults to models/yoga_pose_dnn_model.h5 / .npz / .tflite by backend)')
+    parser.add_argument('--encoder', default='models/label_encoder_dnn.pkl')
+    parser.add_argument('--output', default=None, help='Write results here instead of stdout (.jsonl or .csv)')
+    parser.add_argument('--format', default=None, choices=['jsonl', 'csv'], help='Defaults to the output file extension')
+    parser.add_argument('--workers', type=int, default=None, help='Landmark extraction processes (default: CPU count)')
+    parser.add_argument('--batch-size', type=int, default=256, help='Images per classifier forward pass')
+    parser.add_argument('--max-long-edge', type=int, default=640, help='Decode images no larger than this')
+    parser.add_argument('--threads', type=int, default=None, help='TFLite interpreter thread count')
+    args = parser.parse_args()
+    
+    model_path = args.model or {
+        'keras': 'models/yoga_pose_dnn_model.h5',
+        'numpy': 'models/yoga_pose_dnn_model.npz',
+        'tflite': 'models/yoga_pose_dnn_model.tflite'
+    }[args.backend]
+    
+    predict_batch(args.inputs, model_path, args.encoder, backend=args.backend, output=args.output, fmt=args.format,
+                  workers=args.workers, batch_size=args.batch_size, max_long_edge=args.max_long_edge,
+                  num_threads=args.threads)
+
+# Example usage of the single-image predictor:
+#
+#     predictor = YogaPosePredictor("models/yoga_pose_dnn_model.h5", "models/label_encoder_dnn.pkl", use_hybrid=False)
+#     pose, confidence = predictor.predict("test_image.jpg")
+#
+# Batch mode from the command line:
+#
+#     python predict.py uploads/ "archive/**/*.jpg" --backend numpy --output results.csv
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class AudioCache:
+    """Content-addressed cache of synthesized MP3 bytes.
+
+    Keys are a hash of everything that changes the audio (text, language,
+    gTTS tld, slow). An in-memory LRU bounded by max_memory_bytes sits in
+    front of a directory of <key>.mp3 files bounded by max_disk_bytes; when
+    the directory grows past that, the least recently used files are
+    deleted. get_or_synthesize() runs the synthesis at most once per key even
+    when several threads ask for the same phrase at the same time.
+    """
+
+    def __init__(self, directory, max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()  # key -> mp3 bytes
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, threads holding or waiting for it]
+
+        os.makedirs(directory, exist_ok=True)
+        # key -> (size, last used), oldest first, rebuilt from the directory on startup
+        files = []
+        for name in os.listdir(directory):
+            if name.endswith('.mp3'):
+                stat = os.stat(os.path.join(directory, name))
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        self._disk = OrderedDict((key, size) for _, key, size in sorted(files))
+        self._disk_bytes = sum(self._disk.values())
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.synthesis_ms = 0.0
+
+    @staticmethod
+    def make_key(text, lang, tld, slow):
+        return hashlib.sha256(f"{text}\0{lang}\0{tld}\0{bool(slow)}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _remember(self, key, data):
+        """Put audio in the memory LRU; caller holds self._lock"""
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get(self, key):
+        """Return cached MP3 bytes for key from memory or disk, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+            on_disk = key in self._disk
+
+        if not on_disk:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._remember(key, data)
+            self.disk_hits += 1
+        return data
+
+    def put(self, key, data):
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._remember(key, data)
+            evicted = []
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evicted.append(old_key)
+            self.evictions += len(evicted)
+
+        for old_key in evicted:
+            try:
+                os.unlink(self._path(old_key))
+            except OSError:
+                pass
+
+    def get_or_synthesize(self, text, lang, tld, slow, synthesize):
+        """Return MP3 bytes for the phrase, calling synthesize() -> bytes only on a miss"""
+        key = self.make_key(text, lang, tld, slow)
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        # Refcount the per-key lock so it is only dropped once no thread holds or awaits it
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+            key_lock = entry[0]
+        try:
+            with key_lock:
+                # Another thread may have synthesized it while we waited
+                data = self.get(key)
+                if data is not None:
+                    return data
+                with self._lock:
+                    self.misses += 1
+                start = time.perf_counter()
+                data = synthesize()
+                with self._lock:
+                    self.synthesis_ms += (time.perf_counter() - start) * 1000
+                self.put(key, data)
+                return data
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'avg_synthesis_ms': round(self.synthesis_ms / self.misses, 1) if self.misses else None
+            }
@@ -0,0 +1,118 @@
+import json
+import mmap
+import os
+import threading
+from datetime import datetime, timezone
+
+# Bump when the pack layout changes
+PACK_VERSION = 1
+PACK_PATH = f'app/static/audio_pack_v{PACK_VERSION}'
+
+
+class AudioPack:
+    """Read-only set of pre-rendered MP3s written by build_audio_pack.py.
+
+    <path>.bin holds every MP3 back to back and <path>.json is the manifest:
+    phrases[language][source text] -> audio key, audio[key] -> [offset, length].
+    Phrases are looked up by their source text, so a hit needs neither
+    translation nor synthesis. The .bin file is memory-mapped read-only,
+    so every worker process serves from the same page-cache copy.
+    """
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        self.tld = manifest['tld']
+        self.slow = manifest['slow']
+        self._phrases = manifest['phrases']
+        self._audio = manifest['audio']
+        with open(f"{path}.bin", 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path=PACK_PATH):
+        """Open a pack; returns None if it is missing or was built for another pack version"""
+        if not os.path.exists(f"{path}.json") or not os.path.exists(f"{path}.bin"):
+            print(f"No audio pack at '{path}' (run build_audio_pack.py)")
+            return None
+        try:
+            with open(f"{path}.json", 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('pack_version') != PACK_VERSION:
+                print(f"Ignoring audio pack version {manifest.get('pack_version')} (current: {PACK_VERSION})")
+                return None
+            pack = cls(path, manifest)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading audio pack: {e}")
+            return None
+
+        phrases = sum(len(texts) for texts in pack._phrases.values())
+        print(f"Loaded audio pack with {phrases} phrases in {len(pack._phrases)} languages "
+              f"({len(pack._mm) / (1024 * 1024):.1f} MB)")
+        return pack
+
+    def lookup(self, text, language):
+        """Audio key for a phrase in a language, or None if the pack does not have it"""
+        key = self._phrases.get(language, {}).get(text)
+        with self._lock:
+            if key is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return key
+
+    def get(self, key):
+        """MP3 bytes for an audio key, or None"""
+        location = self._audio.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        return self._mm[offset:offset + length]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'version': self.manifest['pack_version'],
+                'phrases': sum(len(texts) for texts in self._phrases.values()),
+                'audio_files': len(self._audio),
+                'bytes': len(self._mm),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def write_pack(path, entries, tld, slow):
+    """Write <path>.bin and <path>.json from (language, source text, audio key, mp3 bytes) entries.
+
+    Identical audio is stored once. Both files are written to temporary
+    names first and the manifest is replaced last, so a running app never
+    sees a manifest pointing into the wrong data.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    phrases, audio = {}, {}
+    with open(f"{path}.bin.tmp", 'wb') as f:
+        for language, text, key, data in entries:
+            if key not in audio:
+                audio[key] = [f.tell(), len(data)]
+                f.write(data)
+            phrases.setdefault(language, {})[text] = key
+
+    manifest = {
+        'pack_version': PACK_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'tld': tld,
+        'slow': slow,
+        'phrases': phrases,
+        'audio': audio
+    }
+    with open(f"{path}.json.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(f"{path}.bin.tmp", f"{path}.bin")
+    os.replace(f"{path}.json.tmp", f"{path}.json")
+    return manifest
@@ -0,0 +1,176 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """One in-progress upstream call that concurrent callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ContentCache:
+    """In-memory LRU in front of a SQLite store for generated content.
+
+    Values must be JSON-serialisable. get_or_create(key, factory) returns a
+    cached value when there is one; otherwise exactly one caller runs
+    factory() while concurrent callers for the same key wait for its
+    result (single-flight). Entries older than ttl_seconds are still served
+    but refreshed once in the background. If factory raises, nothing is
+    cached and the exception reaches the callers, so fallback content never
+    ends up in the cache.
+    """
+
+    def __init__(self, db_path, max_entries=512, ttl_seconds=7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (value, created_at)
+        self._lock = threading.Lock()
+        self._flights = {}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS content (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)")
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+
+    @staticmethod
+    def make_key(*parts):
+        return '|'.join(str(part) for part in parts)
+
+    def _remember(self, key, value, created_at):
+        """Put an entry in the LRU; caller holds self._lock"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key):
+        with self._db_lock:
+            row = self._db.execute("SELECT value, created_at FROM content WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _store(self, key, value, created_at):
+        with self._db_lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO content (key, value, created_at) VALUES (?, ?, ?)",
+                             (key, json.dumps(value, ensure_ascii=False), created_at))
+
+    def get(self, key):
+        """Return (value, created_at) from memory or disk without calling upstream, or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            with self._lock:
+                self._remember(key, *entry)
+                self.disk_hits += 1
+        return entry
+
+    def put(self, key, value):
+        created_at = time.time()
+        self._store(key, value, created_at)
+        with self._lock:
+            self._remember(key, value, created_at)
+
+    def _run_flight(self, key, factory):
+        """Call factory for key unless a call is already running; returns the shared result"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                with self._lock:
+                    self.upstream_calls += 1
+                flight.value = factory()
+                self.put(key, flight.value)
+            except Exception as e:
+                with self._lock:
+                    self.upstream_errors += 1
+                flight.error = e
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _refresh_in_background(self, key, factory):
+        with self._lock:
+            if key in self._flights:
+                return
+            self.refreshes += 1
+
+        def refresh():
+            try:
+                self._run_flight(key, factory)
+            except Exception as e:
+                print(f"Background refresh of '{key}' failed, keeping the stale entry: {e}")
+
+        threading.Thread(target=refresh, name='content-refresh', daemon=True).start()
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key, calling factory() once if it is missing"""
+        entry = self.get(key)
+        if entry is not None:
+            value, created_at = entry
+            if self.ttl_seconds and time.time() - created_at > self.ttl_seconds:
+                self._refresh_in_background(key, factory)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return self._run_flight(key, factory)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'memory_entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'refreshes': self.refreshes,
+                'upstream_calls': self.upstream_calls,
+                'upstream_errors': self.upstream_errors,
+                'in_flight': len(self._flights)
+            }
+        with self._db_lock:
+            stats['disk_entries'] = self._db.execute("SELECT COUNT(*) FROM content").fetchone()[0]
+        return stats
@@ -0,0 +1,218 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class LLMUnavailable(Exception):
+    """The LLM call was not made or did not finish in time; callers should use cached or fallback content"""
+
+
+class CircuitBreaker:
+    """Closed -> open after failure_threshold consecutive failures -> half-open after reset_seconds.
+
+    While open every call is rejected immediately. Once reset_seconds have
+    passed a single probe call is let through (half-open); its success closes
+    the circuit, its failure opens it again for another reset_seconds.
+    """
+
+    def __init__(self, failure_threshold=3, reset_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print("LLM circuit closed, upstream recovered")
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                    print(f"LLM circuit open after {self.consecutive_failures} consecutive failures, "
+                          f"retrying in {self.reset_seconds}s")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened
+            }
+
+
+class LLMClient:
+    """Deadline- and circuit-breaker-guarded wrapper around a Gemini-style model.
+
+    generate_content() has the same signature as GenerativeModel's, so it can
+    be passed wherever a model is expected. The upstream call runs on a
+    bounded pool of its own threads: the caller waits at most the deadline
+    (request_options['timeout'] or timeout, else default_timeout) and gets
+    LLMUnavailable instead of hanging when the upstream is slow, down, the
+    circuit is open or max_concurrency calls are already outstanding.
+    """
+
+    def __init__(self, model, default_timeout=20, failure_threshold=3, reset_seconds=30, max_concurrency=8):
+        self.model = model
+        self.default_timeout = default_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.short_circuited = 0
+        self.total_latency_ms = 0.0
+
+    def _count(self, name, latency_ms=None):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            if latency_ms is not None:
+                self.total_latency_ms += latency_ms
+
+    def _call(self, prompt, generation_config, request_options):
+        try:
+            if generation_config is not None:
+                return self.model.generate_content(prompt, generation_config=generation_config,
+                                                   request_options=request_options)
+            return self.model.generate_content(prompt, request_options=request_options)
+        finally:
+            self._slots.release()
+
+    def generate_content(self, prompt, generation_config=None, request_options=None, timeout=None):
+        """Call the model within a deadline; raises LLMUnavailable on timeout, open circuit or saturation"""
+        if self.model is None:
+            raise LLMUnavailable("No LLM model configured")
+        timeout = timeout or (request_options or {}).get('timeout') or self.default_timeout
+
+        # Never queue behind calls that are already stuck upstream
+        if not self._slots.acquire(blocking=False):
+            self._count('short_circuited')
+            raise LLMUnavailable("Too many LLM calls in flight")
+        if not self.breaker.allow():
+            self._slots.release()
+            self._count('short_circuited')
+            raise LLMUnavailable("LLM circuit is open")
+
+        self._count('calls')
+        start = time.perf_counter()
+        future = self._executor.submit(self._call, prompt, generation_config, {'timeout': timeout})
+        try:
+            response = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # The pool thread finishes on its own once the SDK gives up; the caller does not wait for it
+            self._count('timeouts')
+            self.breaker.record_failure()
+            raise LLMUnavailable(f"LLM call exceeded {timeout:.1f}s deadline")
+        except Exception:
+            self._count('failures')
+            self.breaker.record_failure()
+            raise
+
+        self._count('successes', (time.perf_counter() - start) * 1000)
+        self.breaker.record_success()
+        return response
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'short_circuited': self.short_circuited,
+                'avg_latency_ms': round(self.total_latency_ms / self.successes, 1) if self.successes else None
+            }
+        stats['circuit'] = self.breaker.stats()
+        return stats
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Offline stand-in for a Gemini model, for exercising timeouts and the circuit breaker without network.
+
+    responder(prompt, generation_config) returns the response text (the
+    default echoes the texts of translation prompts and returns a JSON
+    pose-content object for other JSON requests, the prompt's text otherwise). latency delays every call; set fail to
+    an exception to make calls raise it. Both can be changed at runtime.
+    """
+
+    def __init__(self, responder=None, latency=0.0, fail=None):
+        self.responder = responder or self._default_response
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    @staticmethod
+    def _default_response(prompt, generation_config):
+        # Batch translation prompts: echo the texts back
+        match = re.search(r'^\s*Texts:\s*(\[.*\])\s*$', prompt, re.MULTILINE)
+        if match:
+            return match.group(1)
+        if generation_config and generation_config.get('response_mime_type') == 'application/json':
+            return ('{"instructions": ["Stand tall", "Breathe steadily"], "feedback": "Keep your spine long", '
+                    '"benefits": ["Improves posture"], "contraindications": ["Recent injury"], '
+                    '"timing": "Morning, hold for 30 seconds"}')
+        # Echo the text of translation prompts, otherwise the first line of the prompt
+        match = re.search(r'^\s*Text:\s*(.+)$', prompt, re.MULTILINE)
+        if match:
+            return match.group(1).strip()
+        lines = [line.strip() for line in prompt.strip().splitlines() if line.strip()]
+        return lines[0] if lines else ''
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail is not None:
+            raise self.fail
+        return FakeResponse(self.responder(prompt, generation_config))
+
+
+def create_llm_client(backend='gemini', api_key=None, model_name='gemini-2.5-flash', **kwargs):
+    """Build an LLMClient for the 'gemini' backend (needs api_key) or the offline 'fake' backend"""
+    if backend == 'fake':
+        print("Using the fake LLM backend (no network calls)")
+        return LLMClient(FakeModel(), **kwargs)
+
+    model = None
+    if api_key:
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(model_name)
+    else:
+        print("GEMINI_API_KEY not set, LLM content will use fallbacks")
+    return LLMClient(model, **kwargs)
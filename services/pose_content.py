@@ -0,0 +1,215 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Bump when a prompt below changes so cached and precomputed content for older prompts is not reused
+PROMPT_VERSION = 2
+
+# Fields every generated or precomputed entry must have ('timing' is optional)
+CONTENT_FIELDS = ('instructions', 'feedback', 'benefits', 'contraindications')
+
+# Shared by the fallback path that issues the per-field prompts concurrently
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='pose-content')
+
+LANGUAGE_NAMES = {
+    "en": "Indian English",
+    "hi": "Hindi",
+    "kn": "Kannada",
+    "ta": "Tamil",
+    "te": "Telugu",
+    "mr": "Marathi"
+}
+
+BUNDLE_PATH = f'app/static/pose_content_v{PROMPT_VERSION}.json'
+
+
+def instructions_prompt(traditional_name, language):
+    return f"""
+    Provide very brief, key-point instructions for the yoga pose: {traditional_name}
+    Language: {LANGUAGE_NAMES.get(language, "Indian English")}
+
+    Focus ONLY on the most essential elements:
+    - Arms position (up, down, extended, etc.)
+    - Legs position (straight, bent, apart, etc.)
+    - Head position (neutral, looking up/down, etc.)
+    - Core engagement
+    - Breathing
+
+    Format as simple bullet points. Keep each point under 8 words.
+    Make it suitable for text-to-speech - clear and concise.
+
+    Example format:
+    - Arms extended overhead
+    - Legs hip-width apart
+    - Head neutral
+    - Engage core
+    - Breathe steadily
+    """
+
+
+def feedback_prompt(traditional_name, language):
+    return f"""
+    Provide a very brief feedback tip for the yoga pose: {traditional_name}
+    Language: {LANGUAGE_NAMES.get(language, "Indian English")}
+
+    Give ONE key tip focusing on the most common mistake or important alignment point.
+    Keep it under 15 words and make it encouraging.
+
+    Example: "Keep your spine straight and shoulders relaxed"
+    """
+
+
+def benefits_prompt(traditional_name, language):
+    return f"""
+    List the benefits and contraindications of the yoga pose: {traditional_name}
+    Language: {LANGUAGE_NAMES.get(language, "Indian English")}
+
+    Give 5 benefits and 5 contraindications (who should avoid or modify the pose).
+    Keep each item under 12 words.
+
+    Respond with JSON only, in this format:
+    {{"benefits": ["...", "..."], "contraindications": ["...", "..."]}}
+    """
+
+
+def pose_content_prompt(traditional_name, language):
+    return f"""
+    You are a yoga teacher. For the yoga pose {traditional_name}, write the content below
+    in {LANGUAGE_NAMES.get(language, "Indian English")}. It is read aloud by text-to-speech, so keep it clear and concise.
+
+    Respond with a single JSON object with exactly these keys:
+    - "instructions": 5 short key points (each under 8 words) covering arms position,
+      legs position, head position, core engagement and breathing
+    - "feedback": ONE encouraging tip under 15 words about the most common mistake
+      or the most important alignment point
+    - "benefits": 5 benefits (physical, mental, spiritual), each under 12 words
+    - "contraindications": 3-5 conditions, injuries or situations in which to avoid
+      or modify the pose, each under 12 words
+    - "timing": one or two sentences on best time of day, hold duration and frequency
+
+    "instructions", "benefits" and "contraindications" are arrays of strings;
+    "feedback" and "timing" are strings.
+    """
+
+
+def _clean_section(text, marker):
+    if marker in text:
+        text = text.split(marker)[1].strip()
+    return text
+
+
+def parse_json_response(text):
+    """Parse a JSON object from a model response, tolerating ```json fences"""
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not match:
+        raise ValueError("No JSON object in response")
+    return json.loads(match.group(0))
+
+
+def _as_list(value):
+    if isinstance(value, str):
+        value = [line.lstrip('-•* ').strip() for line in value.splitlines()]
+    return [str(item).strip() for item in value or [] if str(item).strip()]
+
+
+def format_bullets(items, bullet='-'):
+    return '\n'.join(f"{bullet} {item}" for item in items)
+
+
+def run_concurrently(calls, timeout):
+    """Run {name: fn} in parallel and return {name: result}; raises if any call fails or misses the deadline"""
+    futures = {name: _executor.submit(fn) for name, fn in calls.items()}
+    deadline = time.monotonic() + timeout
+    try:
+        return {name: future.result(timeout=max(0.0, deadline - time.monotonic()))
+                for name, future in futures.items()}
+    finally:
+        for future in futures.values():
+            future.cancel()
+
+
+def generate_pose_content(model, traditional_name, language, timeout=20):
+    """Every content field for a pose in one structured-output request.
+
+    Returns instructions (bullet text), feedback, benefits and
+    contraindications (lists) and timing. If the structured response cannot
+    be parsed, falls back to the per-field prompts issued concurrently.
+    """
+    options = {'timeout': timeout}
+    try:
+        response = model.generate_content(
+            pose_content_prompt(traditional_name, language),
+            generation_config={'response_mime_type': 'application/json'},
+            request_options=options
+        )
+        data = parse_json_response(response.text)
+    except ValueError as e:
+        print(f"Structured pose content for {traditional_name} ({language}) unusable, "
+              f"falling back to separate prompts: {e}")
+        return generate_pose_content_separately(model, traditional_name, language, timeout)
+
+    content = {
+        'instructions': format_bullets(_as_list(data.get('instructions'))),
+        'feedback': str(data.get('feedback') or '').strip(),
+        'benefits': _as_list(data.get('benefits')),
+        'contraindications': _as_list(data.get('contraindications')),
+        'timing': str(data.get('timing') or '').strip()
+    }
+    missing = [field for field in CONTENT_FIELDS if not content[field]]
+    if missing:
+        raise ValueError(f"Structured response is missing {', '.join(missing)}")
+    return content
+
+
+def generate_pose_content_separately(model, traditional_name, language, timeout=20):
+    """Fallback for generate_pose_content: the per-field prompts issued concurrently, each with its own timeout"""
+    options = {'timeout': timeout}
+    prompts = {
+        'instructions': instructions_prompt(traditional_name, language),
+        'feedback': feedback_prompt(traditional_name, language),
+        'benefits': benefits_prompt(traditional_name, language)
+    }
+    responses = run_concurrently({
+        name: (lambda prompt=prompt: model.generate_content(prompt, request_options=options).text)
+        for name, prompt in prompts.items()
+    }, timeout)
+
+    instructions_text = _clean_section(responses['instructions'], "INSTRUCTIONS:")
+    feedback_text = _clean_section(responses['feedback'], "FEEDBACK:")
+    data = parse_json_response(responses['benefits'])
+    content = {
+        'instructions': instructions_text.strip(),
+        'feedback': feedback_text.strip(),
+        'benefits': _as_list(data.get('benefits')),
+        'contraindications': _as_list(data.get('contraindications')),
+        'timing': ''
+    }
+    missing = [field for field in CONTENT_FIELDS if not content[field]]
+    if missing:
+        raise ValueError(f"Empty {', '.join(missing)} in Gemini response")
+    return content
+
+
+def load_bundle(path=BUNDLE_PATH):
+    """Load a precomputed content bundle; returns {pose_name: {language: content}} or {} if unusable"""
+    if not os.path.exists(path):
+        print(f"No precomputed pose content at '{path}' (run precompute_content.py)")
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            bundle = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading pose content bundle: {e}")
+        return {}
+
+    if bundle.get('prompt_version') != PROMPT_VERSION:
+        print(f"Ignoring pose content bundle for prompt version {bundle.get('prompt_version')} "
+              f"(current: {PROMPT_VERSION})")
+        return {}
+
+    poses = bundle.get('poses', {})
+    entries = sum(len(languages) for languages in poses.values())
+    print(f"Loaded precomputed content for {len(poses)} poses ({entries} pose/language entries)")
+    return poses
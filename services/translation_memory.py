@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class TranslationMemory:
+    """Persistent (source text, language) -> translation store.
+
+    Lookups go to an in-memory dict, then to a SQLite file that every
+    process of the app shares, so a phrase is only ever sent to the model
+    once per language. translate_many() collects every string that is not
+    known yet and sends them to translate_batch(texts, language) in chunks
+    of batch_size instead of one request per string. Failed translations
+    are never stored.
+    """
+
+    def __init__(self, db_path, batch_size=50):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._memory = {}  # (text, language) -> translation
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._db:
+            # WAL lets the other worker processes read while one of them writes
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations (source TEXT NOT NULL, language TEXT NOT NULL, "
+                "translation TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (source, language))")
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.translated = 0
+        self.failures = 0
+
+    def get(self, text, language):
+        """Known translation of text, or None"""
+        with self._lock:
+            translation = self._memory.get((text, language))
+            if translation is not None:
+                self.memory_hits += 1
+                return translation
+
+        with self._db_lock:
+            row = self._db.execute("SELECT translation FROM translations WHERE source = ? AND language = ?",
+                                   (text, language)).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            self._memory[(text, language)] = row[0]
+            self.disk_hits += 1
+        return row[0]
+
+    def put_many(self, language, translations):
+        """Store {source text: translation} for one language"""
+        now = time.time()
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO translations (source, language, translation, created_at) VALUES (?, ?, ?, ?)",
+                [(text, language, translation, now) for text, translation in translations.items()])
+        with self._lock:
+            for text, translation in translations.items():
+                self._memory[(text, language)] = translation
+
+    def preload(self, path):
+        """Load a {language: {source text: translation}} JSON file; returns the number of entries"""
+        if not os.path.exists(path):
+            print(f"No translation file at '{path}'")
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading translations: {e}")
+            return 0
+
+        count = 0
+        for language, translations in data.items():
+            self.put_many(language, translations)
+            count += len(translations)
+        print(f"Preloaded {count} translations for {len(data)} languages from '{path}'")
+        return count
+
+    def export(self, path):
+        """Write every stored translation as a file preload() can read"""
+        with self._db_lock:
+            rows = self._db.execute("SELECT language, source, translation FROM translations ORDER BY language, source").fetchall()
+        data = {}
+        for language, text, translation in rows:
+            data.setdefault(language, {})[text] = translation
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return len(rows)
+
+    def translate_many(self, texts, language, translate_batch):
+        """Return {text: translation} for texts, calling translate_batch only for the unknown ones.
+
+        Texts whose batch fails map to themselves (untranslated) and are not stored.
+        """
+        results, missing = {}, []
+        for text in dict.fromkeys(texts):
+            translation = self.get(text, language)
+            if translation is None:
+                missing.append(text)
+            else:
+                results[text] = translation
+
+        with self._lock:
+            self.misses += len(missing)
+        for offset in range(0, len(missing), self.batch_size):
+            chunk = missing[offset:offset + self.batch_size]
+            try:
+                translations = translate_batch(chunk, language)
+                if len(translations) != len(chunk):
+                    raise ValueError(f"Got {len(translations)} translations for {len(chunk)} texts")
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                print(f"Error translating {len(chunk)} texts to {language}, using the original text: {e}")
+                results.update((text, text) for text in chunk)
+                continue
+
+            translated = {text: translation.strip() for text, translation in zip(chunk, translations)
+                          if translation and translation.strip()}
+            self.put_many(language, translated)
+            results.update(translated)
+            results.update((text, text) for text in chunk if text not in translated)
+            with self._lock:
+                self.batches += 1
+                self.translated += len(translated)
+        return results
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'memory_entries': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'batches': self.batches,
+                'translated': self.translated,
+                'failures': self.failures
+            }
+        with self._db_lock:
+            stats['disk_entries'] = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return stats
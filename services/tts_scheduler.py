@@ -0,0 +1,215 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class TTSQueueFull(Exception):
+    """Too many TTS jobs are waiting; the caller should skip this utterance"""
+
+
+class _Job:
+    """One unit of TTS work (translate + synthesize), shared by every ticket with the same key"""
+
+    def __init__(self, key, owner, fn):
+        self.key = key
+        self.owner = owner
+        self.fn = fn
+        self.state = 'pending'  # pending -> running -> done, or pending -> cancelled
+        self.interested = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+
+
+class _Ticket:
+    """A session's claim on a job's result"""
+
+    def __init__(self, job, session_id, kind):
+        self.job = job
+        self.session_id = session_id
+        self.kind = kind
+        self.superseded = False
+
+
+def _summary(samples):
+    if not samples:
+        return {'avg': None, 'p95': None}
+    ordered = sorted(samples)
+    # Nearest-rank percentile, so small samples report an observed tail value rather than the minimum
+    p95 = ordered[math.ceil(0.95 * len(ordered)) - 1]
+    return {'avg': round(sum(ordered) / len(ordered), 1), 'p95': round(p95, 1)}
+
+
+class TTSScheduler:
+    """Bounded pool of TTS workers with a queue per session.
+
+    submit(session_id, kind, key, fn) queues fn() (which returns an audio
+    key) and returns a ticket for wait(). A newer submission of the same
+    kind from the same session supersedes the session's older tickets:
+    their waiters return None straight away and jobs nobody waits for any
+    more are dropped before they start. Submissions with a key already
+    pending or running (from any session) share that job instead of
+    synthesizing again. Each session has at most one job running at a time,
+    and sessions take turns, so one busy user cannot starve the others.
+    """
+
+    def __init__(self, workers=4, max_pending=256, latency_window=500):
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self._cond = threading.Condition()
+        self._queues = {}  # session_id -> deque of pending jobs it owns
+        self._ready = deque()  # sessions with pending jobs and none running
+        self._ready_set = set()
+        self._running = set()
+        self._tickets = {}  # session_id -> live tickets
+        self._jobs = {}  # key -> pending or running job
+        self._pending = 0
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.superseded = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self._wait_ms = deque(maxlen=latency_window)
+        self._synthesis_ms = deque(maxlen=latency_window)
+
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f'tts-worker-{i}', daemon=True).start()
+
+    def _release(self, ticket):
+        """Drop a ticket's interest in its job; caller holds self._cond"""
+        job = ticket.job
+        job.interested -= 1
+        if job.state == 'pending' and job.interested == 0:
+            job.state = 'cancelled'
+            self._queues[job.owner].remove(job)
+            if not self._queues[job.owner]:
+                del self._queues[job.owner]
+                if job.owner in self._ready_set:
+                    self._ready_set.discard(job.owner)
+                    self._ready.remove(job.owner)
+            del self._jobs[job.key]
+            self._pending -= 1
+            self.dropped += 1
+
+    def _forget(self, ticket):
+        tickets = self._tickets.get(ticket.session_id)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._tickets[ticket.session_id]
+
+    def submit(self, session_id, kind, key, fn):
+        """Queue fn() for session_id; returns a ticket for wait(). Raises TTSQueueFull when the queue is full."""
+        with self._cond:
+            # Anything this session is still waiting for of the same kind is stale now
+            for ticket in list(self._tickets.get(session_id, [])):
+                if ticket.kind == kind:
+                    ticket.superseded = True
+                    self.superseded += 1
+                    self._forget(ticket)
+                    self._release(ticket)
+
+            job = self._jobs.get(key)
+            if job is not None:
+                self.coalesced += 1
+            else:
+                if self._pending >= self.max_pending:
+                    self.rejected += 1
+                    raise TTSQueueFull(f"{self._pending} TTS jobs already waiting")
+                job = _Job(key, session_id, fn)
+                self._jobs[key] = job
+                self._queues.setdefault(session_id, deque()).append(job)
+                self._pending += 1
+                self.max_depth = max(self.max_depth, self._pending)
+                if session_id not in self._running and session_id not in self._ready_set:
+                    self._ready.append(session_id)
+                    self._ready_set.add(session_id)
+
+            job.interested += 1
+            ticket = _Ticket(job, session_id, kind)
+            self._tickets.setdefault(session_id, []).append(ticket)
+            self.submitted += 1
+            self._cond.notify_all()
+            return ticket
+
+    def wait(self, ticket, timeout=None):
+        """Result of a ticket's job; None if it was superseded. Raises TimeoutError or the job's error."""
+        with self._cond:
+            finished = self._cond.wait_for(lambda: ticket.superseded or ticket.job.state == 'done', timeout)
+            if ticket.superseded:
+                return None
+            self._forget(ticket)
+            if not finished:
+                self.timeouts += 1
+                self._release(ticket)
+                raise TimeoutError("TTS job did not finish in time")
+            ticket.job.interested -= 1
+
+        if ticket.job.error is not None:
+            raise ticket.job.error
+        return ticket.job.result
+
+    def _work(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._ready)
+                session_id = self._ready.popleft()
+                self._ready_set.discard(session_id)
+                queue = self._queues[session_id]
+                job = queue.popleft()
+                if not queue:
+                    del self._queues[session_id]
+                self._pending -= 1
+                self._running.add(session_id)
+                job.state = 'running'
+
+            started = time.perf_counter()
+            try:
+                job.result = job.fn()
+            except Exception as e:
+                job.error = e
+            finished = time.perf_counter()
+
+            with self._cond:
+                job.state = 'done'
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+                if job.error is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                    print(f"TTS job failed: {job.error}")
+                self._wait_ms.append((started - job.submitted_at) * 1000)
+                self._synthesis_ms.append((finished - started) * 1000)
+                self._running.discard(session_id)
+                if session_id in self._queues and session_id not in self._ready_set:
+                    self._ready.append(session_id)
+                    self._ready_set.add(session_id)
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'busy_workers': len(self._running),
+                'queue_depth': self._pending,
+                'max_queue_depth': self.max_depth,
+                'sessions_waiting': len(self._queues),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'superseded': self.superseded,
+                'dropped_before_start': self.dropped,
+                'completed': self.completed,
+                'failed': self.failed,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+                'queue_wait_ms': _summary(self._wait_ms),
+                'synthesis_ms': _summary(self._synthesis_ms)
+            }
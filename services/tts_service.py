@@ -1,170 +1,190 @@
 from gtts import gTTS
-import pygame
-import threading
 import time
 import os
 import sys
-import google.generativeai as genai
 from dotenv import load_dotenv
 import io
-import tempfile
+import json
+import re
+
+from services.audio_cache import AudioCache
+from services.llm_client import create_llm_client
+from services.translation_memory import TranslationMemory
+
+# Only needed to play audio on this machine; the web app serves MP3s to the browser instead
+try:
+    import pygame
+except ImportError:
+    pygame = None
 
 # Load environment variables
 load_dotenv()
 
+WELCOME_TEXT = "Welcome to the yoga session. Let's begin your practice with mindful breathing."
+
 class AdvancedIndianTTSSystem:
-    def __init__(self):
-        self.is_speaking = False
+    def __init__(self, llm_client=None, translate_timeout=5, audio_cache=None, local_playback=True, audio_pack=None,
+                 translation_memory=None):
         self.current_language = 'en'
         self.tld = 'co.in'  # Use Indian domain for more natural Indian English
-        self.current_thread = None
-        self.current_temp_file = None
+        self.slow = False  # Fast speech
+        
+        # Synthesized MP3s by (text, language, tld, slow), so repeated phrases skip gTTS
+        self.audio_cache = audio_cache or AudioCache('cache/audio')
+        # Pre-rendered phrases (build_audio_pack.py), only usable if rendered with the same voice
+        if audio_pack is not None and (audio_pack.tld, audio_pack.slow) != (self.tld, self.slow):
+            print("⚠️ Audio pack was rendered with a different voice, ignoring it")
+            audio_pack = None
+        self.audio_pack = audio_pack
         
-        # Initialize Gemini API
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if self.gemini_api_key:
-            genai.configure(api_key=self.gemini_api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
+        # Gemini for translation, through the deadline/circuit-breaker client (shared with the app when given)
+        self.translate_timeout = translate_timeout
+        self.translation_memory = translation_memory or TranslationMemory('cache/translations.sqlite3')
+        self.llm_client = llm_client or create_llm_client(api_key=os.getenv('GEMINI_API_KEY'))
+        if self.llm_client.model is not None:
             print("✅ Gemini API initialized successfully")
         else:
             print("⚠️ GEMINI_API_KEY not found in environment variables")
-            self.gemini_model = None
         
-        # Initialize pygame for audio playback with optimized settings
-        try:
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=256)  # Smaller buffer for faster response
-            print("✅ Pygame audio initialized")
-        except Exception as e:
-            print(f"⚠️ Pygame audio initialization failed: {e}")
+        # Initialize pygame for local audio playback with optimized settings
+        self.local_playback = False
+        if local_playback and pygame is not None:
+            try:
+                pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=256)  # Smaller buffer for faster response
+                self.local_playback = True
+                print("✅ Pygame audio initialized")
+            except Exception as e:
+                print(f"⚠️ Pygame audio initialization failed: {e}")
+        elif local_playback:
+            print("⚠️ pygame not installed, local playback disabled")
+        
+        print("✅ gTTS system initialized")
+        
+    def translate_batch_with_gemini(self, texts, target_language):
+        """Translate a list of texts with one Gemini request; returns the translations in the same order"""
+        if self.llm_client.model is None:
+            raise RuntimeError("Gemini model not available")
         
-        print("✅ gTTS system initialized with non-blocking audio")
+        language_names = {
+            'en': 'Indian English',
+            'hi': 'Hindi',
+            'kn': 'Kannada', 
+            'ta': 'Tamil',
+            'te': 'Telugu',
+            'mr': 'Marathi'
+        }
         
+        target_lang_name = language_names.get(target_language, 'English')
+        
+        prompt = f"""
+        Translate each of the following texts to {target_lang_name}. 
+        Make them natural and easy to understand for voice synthesis.
+        Keep them concise and clear. Keep Sanskrit pose names as names, written in the target script.
+        
+        Respond with a JSON array of strings: the translations, in the same order as the input.
+        
+        Texts: {json.dumps(texts, ensure_ascii=False)}
+        """
+        
+        # Bounded by translate_timeout (scaled for big batches); fails immediately while the circuit is open
+        response = self.llm_client.generate_content(
+            prompt,
+            generation_config={'response_mime_type': 'application/json'},
+            timeout=self.translate_timeout * (1 + len(texts) // 20)
+        )
+        match = re.search(r'\[.*\]', response.text, re.DOTALL)
+        if not match:
+            raise ValueError("No JSON array in translation response")
+        return [str(item) for item in json.loads(match.group(0))]
+    
+    def translate_many(self, texts, target_language):
+        """Translate texts through the translation memory; returns {text: translation}"""
+        return self.translation_memory.translate_many(texts, target_language, self.translate_batch_with_gemini)
+    
     def translate_with_gemini(self, text, target_language):
-        """Use Gemini to translate text to target language"""
-        if not self.gemini_model:
-            print("⚠️ Gemini model not available, using original text")
-            return text
-            
-        try:
-            language_names = {
-                'en': 'Indian English',
-                'hi': 'Hindi',
-                'kn': 'Kannada', 
-                'ta': 'Tamil',
-                'te': 'Telugu',
-                'mr': 'Marathi'
-            }
-            
-            target_lang_name = language_names.get(target_language, 'English')
-            
-            prompt = f"""
-            Translate the following text to {target_lang_name}. 
-            Make it natural and easy to understand for voice synthesis.
-            Keep it concise and clear.
-            
-            Text: {text}
-            
-            Translation:
-            """
-            
-            response = self.gemini_model.generate_content(prompt)
-            translated_text = response.text.strip()
-            
-            # Clean up the response
-            if "Translation:" in translated_text:
-                translated_text = translated_text.split("Translation:")[1].strip()
-            
-            print(f"🌍 Translated to {target_lang_name}: {translated_text}")
-            return translated_text
-            
-        except Exception as e:
-            print(f"Error translating with Gemini: {e}")
-            print("Using original text as fallback")
-            return text
+        """Use Gemini to translate text to target language (remembered, so each text is only sent once)"""
+        translated_text = self.translate_many([text], target_language)[text]
+        print(f"🌍 Translated to {target_language}: {translated_text}")
+        return translated_text
     
-    def stop_speaking(self):
-        """Stop current speech and clean up"""
-        try:
-            if self.is_speaking:
-                pygame.mixer.music.stop()
-                self.is_speaking = False
-                
-            # Clean up current temp file
-            if self.current_temp_file and os.path.exists(self.current_temp_file):
-                try:
-                    os.unlink(self.current_temp_file)
-                except:
-                    pass
-                self.current_temp_file = None
-                
-            print("🔇 Speech stopped")
-        except Exception as e:
-            print(f"Error stopping speech: {e}")
-
-    def speak(self, text, language='en'):
-        """Speak text using gTTS with female voice - NON-BLOCKING version"""
-        try:
-            # Stop any current speech
-            self.stop_speaking()
-            
-            # Translate text if needed (only for Hindi)
-            if language == 'hi':
-                translated_text = self.translate_with_gemini(text, language)
-            else:
-                translated_text = text
-            
-            print(f"🎤 Speaking ({language}): {translated_text}")
-            
-            # Create gTTS object with optimized settings for speed
+    def needs_translation(self, language):
+        """Only Hindi is translated; other languages speak the text as given"""
+        return language == 'hi'
+    
+    def synthesize(self, text, language='en'):
+        """MP3 bytes for text, from the audio cache or synthesized in memory with gTTS"""
+        def render():
             tts = gTTS(
-                text=translated_text, 
+                text=text, 
                 lang=language, 
-                slow=False,  # Fast speech
+                slow=self.slow,
                 tld=self.tld  # Indian domain for more natural pronunciation
             )
+            buffer = io.BytesIO()
+            tts.write_to_fp(buffer)
+            return buffer.getvalue()
+        
+        return self.audio_cache.get_or_synthesize(text, language, self.tld, self.slow, render)
+    
+    def prepare_audio(self, text, language='en'):
+        """Translate if needed and make sure the MP3 is cached; returns the audio key"""
+        # Pre-rendered phrases need no translation or synthesis
+        if self.audio_pack is not None:
+            key = self.audio_pack.lookup(text, language)
+            if key is not None:
+                return key
+        
+        # Translate text if needed (only for Hindi)
+        if self.needs_translation(language):
+            text = self.translate_with_gemini(text, language)
+        self.synthesize(text, language)
+        return self.audio_cache.make_key(text, language, self.tld, self.slow)
+    
+    def welcome_audio(self, language='en'):
+        return self.prepare_audio(WELCOME_TEXT, language)
+    
+    def pose_feedback_audio(self, pose_name, feedback, language='en'):
+        """Audio key for a pose announcement (only the pose name is spoken)"""
+        return self.prepare_audio(pose_name, language)
+    
+    def get_audio(self, key):
+        """MP3 bytes for a key from prepare_audio, or None"""
+        if self.audio_pack is not None:
+            audio = self.audio_pack.get(key)
+            if audio is not None:
+                return audio
+        return self.audio_cache.get(key)
+    
+    @property
+    def is_speaking(self):
+        """Whether local playback is in progress (the mixer knows; no polling thread needed)"""
+        return self.local_playback and pygame.mixer.music.get_busy()
+    
+    def speak(self, text, language='en'):
+        """Speak text on this machine using gTTS with female voice - NON-BLOCKING version"""
+        if not self.local_playback:
+            print("⚠️ Local playback is not available")
+            return False
+        try:
+            # Stop any current speech
+            self.stop_speaking()
             
-            # Create a temporary file to store the audio
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                temp_filename = temp_file.name
-                tts.save(temp_filename)
-            
-            self.current_temp_file = temp_filename
-            self.is_speaking = True
+            key = self.prepare_audio(text, language)
+            audio = self.get_audio(key)
+            print(f"🎤 Speaking ({language}): {text}")
             
-            # Play the audio using pygame (non-blocking)
-            pygame.mixer.music.load(temp_filename)
+            # Play the audio from memory using pygame (non-blocking)
+            pygame.mixer.music.load(io.BytesIO(audio), 'mp3')
             pygame.mixer.music.play()
-            
-            # Start a thread to monitor playback completion
-            def monitor_playback():
-                while pygame.mixer.music.get_busy() and self.is_speaking:
-                    time.sleep(0.1)
-                
-                # Clean up when done
-                if self.is_speaking:  # Only clean up if we weren't interrupted
-                    try:
-                        os.unlink(temp_filename)
-                    except:
-                        pass
-                    self.current_temp_file = None
-                    self.is_speaking = False
-                    print("✅ Speech completed")
-            
-            self.current_thread = threading.Thread(target=monitor_playback)
-            self.current_thread.daemon = True
-            self.current_thread.start()
-            
             return True
             
         except Exception as e:
             print(f"Error speaking: {e}")
-            self.is_speaking = False
             return False
     
     def speak_welcome(self, language='en'):
         """Speak welcome message"""
-        welcome_text = "Welcome to the yoga session. Let's begin your practice with mindful breathing."
-        return self.speak(welcome_text, language)
+        return self.speak(WELCOME_TEXT, language)
     
     def speak_pose_feedback(self, pose_name, feedback, language='en'):
         """Speak only the pose name"""
@@ -185,8 +205,8 @@ class AdvancedIndianTTSSystem:
     def stop_speaking(self):
         """Stop current speech"""
         try:
-            pygame.mixer.music.stop()
-            self.is_speaking = False
+            if self.local_playback:
+                pygame.mixer.music.stop()
             print("🛑 Speech stopped")
         except Exception as e:
             print(f"Error stopping speech: {e}")
@@ -148,8 +148,13 @@ def main():
     with open("models/label_encoder_dnn.pkl", "wb") as f:
         pickle.dump(le, f)
     
+    # Keep the extracted landmarks for quantization calibration and backend comparisons
+    np.savez_compressed("models/landmark_data_dnn.npz",
+                        X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test)
+    
     print("\nModel saved as 'models/yoga_pose_dnn_model.h5'")
     print("Label encoder saved as 'models/label_encoder_dnn.pkl'")
+    print("Landmark data saved as 'models/landmark_data_dnn.npz'")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,150 @@
+import csv
+import glob
+import io
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+from .image_ingest import decode_image
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp'}
+
+RESULT_FIELDS = ('file', 'pose', 'confidence', 'error', 'decode_ms', 'landmarks_ms', 'classify_ms', 'total_ms')
+
+
+def expand_inputs(inputs):
+    """Turn directories, glob patterns and file paths into a sorted list of image files"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, name) for name in files
+                             if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+        elif any(ch in item for ch in '*?['):
+            paths.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            print(f"Skipping '{item}': not a file, directory or matching glob")
+    return sorted(paths)
+
+
+def extract_image_landmarks(pose_utils, data, max_long_edge=640):
+    """Decode one encoded image and extract its landmarks; returns a partial result row"""
+    row = {'landmarks': None, 'error': None}
+
+    start = time.perf_counter()
+    image, _ = decode_image(data, max_long_edge, to_rgb=True)
+    row['decode_ms'] = (time.perf_counter() - start) * 1000.0
+    if image is None:
+        row['error'] = 'Could not read image'
+        return row
+
+    start = time.perf_counter()
+    landmarks, _ = pose_utils.extract_landmarks(image, is_rgb=True)
+    row['landmarks_ms'] = (time.perf_counter() - start) * 1000.0
+    if landmarks is None:
+        row['error'] = 'No pose detected'
+    else:
+        row['landmarks'] = landmarks.astype(np.float32)
+    return row
+
+
+def classify_rows(rows, predict_fn, labels):
+    """Classify every row that has landmarks with a single vectorized forward pass"""
+    ready = [row for row in rows if row.get('landmarks') is not None]
+    if ready:
+        start = time.perf_counter()
+        probabilities = np.asarray(predict_fn(np.stack([row['landmarks'] for row in ready])))
+        # Amortise the batch's forward pass over its images
+        classify_ms = (time.perf_counter() - start) * 1000.0 / len(ready)
+
+        class_indices = probabilities.argmax(axis=1)
+        for row, class_idx, probs in zip(ready, class_indices, probabilities):
+            row['pose'] = str(labels[class_idx])
+            row['confidence'] = float(probs[class_idx])
+            row['classify_ms'] = classify_ms
+
+    for row in rows:
+        row.pop('landmarks', None)
+        row['total_ms'] = sum(row.get(name) or 0.0 for name in ('decode_ms', 'landmarks_ms', 'classify_ms'))
+        for name in ('decode_ms', 'landmarks_ms', 'classify_ms', 'total_ms'):
+            if row.get(name) is not None:
+                row[name] = round(row[name], 3)
+    return rows
+
+
+class ResultFormatter:
+    """Render result rows as JSON lines or CSV"""
+
+    def __init__(self, fmt='jsonl'):
+        if fmt not in ('jsonl', 'csv'):
+            raise ValueError(f"Unknown output format '{fmt}' (use jsonl or csv)")
+        self.fmt = fmt
+
+    @property
+    def mimetype(self):
+        return 'text/csv' if self.fmt == 'csv' else 'application/x-ndjson'
+
+    def header(self):
+        return self._csv_line(RESULT_FIELDS) if self.fmt == 'csv' else ''
+
+    def format(self, row):
+        if self.fmt == 'csv':
+            return self._csv_line([row.get(name, '') if row.get(name) is not None else '' for name in RESULT_FIELDS])
+        return json.dumps({name: row.get(name) for name in RESULT_FIELDS}) + '\n'
+
+    def _csv_line(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(values)
+        return buffer.getvalue()
+
+
+# Process-pool workers for the CLI: one static-image MediaPipe graph per process
+_worker_pose = None
+_worker_max_long_edge = 640
+
+
+def _init_worker(max_long_edge):
+    global _worker_pose, _worker_max_long_edge
+    from .pose_utils import PoseUtils
+    _worker_pose = PoseUtils()
+    _worker_max_long_edge = max_long_edge
+
+
+def _extract_path(path):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return {'file': path, 'landmarks': None, 'error': f'Could not open file: {e}'}
+    try:
+        row = extract_image_landmarks(_worker_pose, data, _worker_max_long_edge)
+    except Exception as e:
+        # One bad file is reported in its row instead of ending a run over thousands of images
+        row = {'landmarks': None, 'error': f'Could not process image: {e}'}
+    row['file'] = path
+    return row
+
+
+def iter_batch_results(paths, predict_fn, labels, workers=None, batch_size=256, max_long_edge=640):
+    """Yield result rows for image paths: landmarks in worker processes, classification in large batches"""
+    workers = workers or os.cpu_count() or 1
+    # Forking after TensorFlow has started its threads is unsafe, so only fork a TF-free parent
+    use_fork = 'fork' in mp.get_all_start_methods() and 'tensorflow' not in sys.modules
+    ctx = mp.get_context('fork' if use_fork else 'spawn')
+    chunksize = max(1, min(16, len(paths) // (workers * 4) or 1))
+
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(max_long_edge,)) as pool:
+        pending = []
+        for row in pool.imap(_extract_path, paths, chunksize=chunksize):
+            pending.append(row)
+            if len(pending) >= batch_size:
+                yield from classify_rows(pending, predict_fn, labels)
+                pending = []
+        if pending:
+            yield from classify_rows(pending, predict_fn, labels)
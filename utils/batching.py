@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+
+class _PendingPrediction:
+    """A single landmark row waiting for its slot in a batched forward pass"""
+    __slots__ = ('row', 'event', 'result', 'error', 'forward_ms')
+
+    def __init__(self, row):
+        self.row = row
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.forward_ms = None
+
+
+class MicroBatcher:
+    """Collect concurrent prediction requests and run them as one batched forward pass.
+
+    Callers block in ``predict`` while a background thread gathers rows for up to
+    ``max_wait_ms`` milliseconds (or until ``max_batch_size`` rows are queued), runs
+    ``predict_fn`` once on the stacked batch and hands each caller its own output row.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_ms = float(max_wait_ms)
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        # Statistics about the batches actually achieved
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._total_batches = 0
+        self._total_rows = 0
+        self._total_forward_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def predict(self, row, timeout=None):
+        """Queue one landmark vector and block until its class probabilities are ready"""
+        return self.predict_timed(row, timeout)[0]
+
+    def predict_timed(self, row, timeout=None):
+        """Like predict, but return (probabilities, forward_ms) where forward_ms is the duration of
+        the forward pass the row was part of, without the time spent waiting for the batch"""
+        pending = _PendingPrediction(np.asarray(row, dtype=np.float32).reshape(-1))
+
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("MicroBatcher has been closed")
+            self._queue.append(pending)
+            self._cond.notify()
+
+        if not pending.event.wait(timeout):
+            raise TimeoutError("Timed out waiting for batched prediction")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result, pending.forward_ms
+
+    def _collect_batch(self):
+        """Wait for the first request, then linger until the batch is full or the window closes"""
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            while len(self._queue) < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch_size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(batch_size)]
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                return
+
+            start = time.perf_counter()
+            try:
+                outputs = np.asarray(self.predict_fn(np.stack([p.row for p in batch])))
+                for pending, output in zip(batch, outputs):
+                    pending.result = output
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            elapsed = time.perf_counter() - start
+
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._total_batches += 1
+                self._total_rows += len(batch)
+                self._total_forward_seconds += elapsed
+
+            for pending in batch:
+                pending.forward_ms = elapsed * 1000.0
+                pending.event.set()
+
+    def stats(self):
+        """Report settings and the batch-size distribution achieved so far"""
+        with self._stats_lock:
+            histogram = dict(sorted(self._batch_sizes.items()))
+            batches = self._total_batches
+            rows = self._total_rows
+            forward_seconds = self._total_forward_seconds
+
+        with self._cond:
+            queue_depth = len(self._queue)
+
+        percentiles = {}
+        if batches:
+            sizes = np.repeat(list(histogram.keys()), list(histogram.values()))
+            for p in (50, 90, 99):
+                percentiles[f'p{p}'] = float(np.percentile(sizes, p))
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'batches': batches,
+            'rows': rows,
+            'queue_depth': queue_depth,
+            'mean_batch_size': rows / batches if batches else 0.0,
+            'batch_size_percentiles': percentiles,
+            'batch_size_histogram': histogram,
+            'mean_forward_ms': forward_seconds * 1000.0 / batches if batches else 0.0
+        }
+
+    def close(self):
+        """Stop the worker thread after draining already queued requests"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
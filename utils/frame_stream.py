@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+class LatestFrameChannel:
+    """Hand frames from a streaming connection to its processing thread, newest first.
+
+    The socket reader calls put() for every incoming message and a single
+    processing thread takes them with get(). At most one frame is ever
+    pending: a frame that is still waiting when a newer one arrives is
+    dropped, so latency stays bounded when inference falls behind the camera.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = None
+        self._closed = False
+
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+
+    def put(self, payload):
+        """Queue a frame, replacing any frame that has not been picked up yet"""
+        with self._cond:
+            if self._closed:
+                return False
+            if self._pending is not None:
+                self.dropped += 1
+            self.received += 1
+            self._pending = (self.received, payload, time.perf_counter())
+            self._cond.notify()
+        return True
+
+    def get(self, timeout=None):
+        """Wait for the newest frame; returns (seq, payload, received_at) or None once closed"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._pending is not None or self._closed, timeout):
+                return None
+            if self._pending is None:
+                return None
+            frame, self._pending = self._pending, None
+            self.processed += 1
+            return frame
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'received': self.received,
+                'processed': self.processed,
+                'dropped': self.dropped
+            }
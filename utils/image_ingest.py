@@ -0,0 +1,96 @@
+import struct
+
+import cv2
+import numpy as np
+
+# JPEG start-of-frame markers (baseline, progressive, lossless...), excluding DHT/JPG/DAC
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Largest reduction first; JPEG decoders apply these during the IDCT, so they are almost free
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+
+def read_image_size(data):
+    """Read (width, height) from a JPEG, PNG or BMP header without decoding the image.
+
+    data can be bytes or a memoryview over the uploaded buffer.
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+
+    if data[:2] == b'BM' and len(data) >= 26:
+        width, height = struct.unpack('<ii', data[18:26])
+        return width, abs(height)
+
+    if data[:2] == b'\xff\xd8':
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker == 0xFF:
+                i += 1  # fill byte
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                i += 2  # standalone markers carry no length
+                continue
+            if marker in _JPEG_SOF_MARKERS:
+                height, width = struct.unpack('>HH', data[i + 5:i + 9])
+                return width, height
+            i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+
+    return None
+
+
+def decode_image(data, max_long_edge=640, to_rgb=False):
+    """Decode an uploaded image at no more resolution than pose estimation needs.
+
+    Picks the largest IMREAD_REDUCED_* factor that keeps the long edge at or
+    above max_long_edge, then resizes down to max_long_edge if still larger.
+    With to_rgb=True the BGR->RGB swap is done in place on the buffer we
+    already own instead of allocating another copy.
+
+    Returns (image, info) where info records the original and processed
+    sizes, or (None, None) if the data cannot be decoded.
+    """
+    buffer = data if isinstance(data, np.ndarray) else np.frombuffer(data, np.uint8)
+    if buffer.size == 0:
+        # cv2.imdecode raises on an empty buffer instead of returning None
+        return None, None
+    original_size = read_image_size(memoryview(buffer))
+
+    flag, reduction = cv2.IMREAD_COLOR, 1
+    if original_size and max_long_edge:
+        long_edge = max(original_size)
+        for factor, reduced_flag in _REDUCED_FLAGS:
+            if long_edge // factor >= max_long_edge:
+                flag, reduction = reduced_flag, factor
+                break
+
+    image = cv2.imdecode(buffer, flag)
+    if image is None:
+        return None, None
+
+    decoded_size = (image.shape[1], image.shape[0])
+    if max_long_edge and max(decoded_size) > max_long_edge:
+        scale = max_long_edge / max(decoded_size)
+        new_size = (max(1, round(decoded_size[0] * scale)), max(1, round(decoded_size[1] * scale)))
+        # The reduced decode already did the bulk of the downscaling; bilinear is ~7x cheaper than INTER_AREA here
+        image = cv2.resize(image, new_size, interpolation=cv2.INTER_LINEAR)
+
+    if to_rgb:
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
+    info = {
+        'original_size': list(original_size) if original_size else None,
+        'decoded_size': list(decoded_size),
+        'processed_size': [image.shape[1], image.shape[0]],
+        'reduction': reduction,
+        'bytes': len(buffer)
+    }
+    return image, info
@@ -0,0 +1,307 @@
+import json
+import threading
+import time
+
+import numpy as np
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _linear(x):
+    return x
+
+
+def _softmax(x):
+    x = x.astype(np.float32, copy=False)
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+_ACTIVATIONS = {
+    'relu': _relu,
+    'linear': _linear,
+    'softmax': _softmax
+}
+
+_SKIPPED_LAYERS = ('InputLayer', 'Dropout')
+
+
+def _decode(name):
+    return name.decode('utf-8') if isinstance(name, bytes) else name
+
+
+def read_dense_layers_h5(h5_path):
+    """Read (kernel, bias, activation) for every Dense layer of a saved Sequential .h5 model.
+
+    Only h5py is needed, so weights can be exported on machines without TensorFlow.
+    """
+    import h5py
+
+    with h5py.File(h5_path, 'r') as f:
+        model_config = json.loads(_decode(f.attrs['model_config']))
+        config = model_config['config']
+        layer_configs = config['layers'] if isinstance(config, dict) else config
+        weights_group = f['model_weights'] if 'model_weights' in f else f
+
+        dense_layers = []
+        for layer in layer_configs:
+            class_name = layer['class_name']
+            if class_name in _SKIPPED_LAYERS:
+                continue
+            if class_name != 'Dense':
+                raise ValueError(f"Unsupported layer for NumPy export: {class_name}")
+
+            layer_config = layer['config']
+            activation = layer_config.get('activation', 'linear')
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for NumPy export: {activation}")
+
+            group = weights_group[layer_config['name']]
+            weight_names = [_decode(n) for n in group.attrs['weight_names']]
+            kernel_name = next(n for n in weight_names if n.split('/')[-1].startswith('kernel'))
+            bias_names = [n for n in weight_names if n.split('/')[-1].startswith('bias')]
+
+            kernel = np.array(group[kernel_name], dtype=np.float32)
+            if bias_names:
+                bias = np.array(group[bias_names[0]], dtype=np.float32)
+            else:
+                bias = np.zeros(kernel.shape[1], dtype=np.float32)
+
+            dense_layers.append((kernel, bias, activation))
+
+    return dense_layers
+
+
+def read_dense_layers_keras(model):
+    """Read (kernel, bias, activation) for every Dense layer of a loaded Keras model"""
+    dense_layers = []
+    for layer in model.layers:
+        class_name = layer.__class__.__name__
+        if class_name in _SKIPPED_LAYERS:
+            continue
+        if class_name != 'Dense':
+            raise ValueError(f"Unsupported layer for NumPy export: {class_name}")
+
+        weights = layer.get_weights()
+        kernel = np.asarray(weights[0], dtype=np.float32)
+        bias = np.asarray(weights[1], dtype=np.float32) if len(weights) > 1 else np.zeros(kernel.shape[1], dtype=np.float32)
+        dense_layers.append((kernel, bias, layer.activation.__name__))
+
+    return dense_layers
+
+
+def export_dense_layers_npz(dense_layers, npz_path, precision='float32'):
+    """Write Dense layers to a compact .npz bundle.
+
+    precision controls how kernels are stored: 'float32', 'float16' or 'int8'
+    (symmetric per-output-channel scales). Biases are always kept in float32.
+    """
+    if precision not in ('float32', 'float16', 'int8'):
+        raise ValueError(f"Unsupported precision: {precision}")
+
+    arrays = {
+        'precision': np.array(precision),
+        'activations': np.array([activation for _, _, activation in dense_layers])
+    }
+
+    for i, (kernel, bias, _) in enumerate(dense_layers):
+        if precision == 'int8':
+            scale = np.abs(kernel).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            arrays[f'kernel_{i}'] = np.round(kernel / scale).astype(np.int8)
+            arrays[f'kernel_scale_{i}'] = scale.astype(np.float32)
+        else:
+            arrays[f'kernel_{i}'] = kernel.astype(precision)
+        arrays[f'bias_{i}'] = bias.astype(np.float32)
+
+    np.savez_compressed(npz_path, **arrays)
+
+
+class NumpyDNN:
+    """Forward pass of the landmark DNN (Dense + ReLU ... softmax) using only NumPy"""
+
+    def __init__(self, dense_layers, compute_dtype='float32'):
+        self.compute_dtype = np.dtype(compute_dtype)
+        self.layers = [
+            (kernel.astype(self.compute_dtype), bias.astype(self.compute_dtype), _ACTIVATIONS[activation])
+            for kernel, bias, activation in dense_layers
+        ]
+
+    @classmethod
+    def load(cls, npz_path, compute_dtype='float32'):
+        """Load weights written by export_dense_layers_npz"""
+        with np.load(npz_path) as bundle:
+            precision = str(bundle['precision'])
+            activations = [str(a) for a in bundle['activations']]
+
+            dense_layers = []
+            for i, activation in enumerate(activations):
+                kernel = bundle[f'kernel_{i}'].astype(np.float32)
+                if precision == 'int8':
+                    kernel *= bundle[f'kernel_scale_{i}']
+                dense_layers.append((kernel, bundle[f'bias_{i}'], activation))
+
+        return cls(dense_layers, compute_dtype=compute_dtype)
+
+    @property
+    def input_dim(self):
+        return self.layers[0][0].shape[0]
+
+    @property
+    def num_classes(self):
+        return self.layers[-1][0].shape[1]
+
+    def predict(self, x):
+        """Return class probabilities for a batch (or a single row) of landmark vectors"""
+        x = np.asarray(x, dtype=self.compute_dtype)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            x = activation(x)
+
+        return x.astype(np.float32, copy=False)
+
+
+class KerasPredictor:
+    """Run a Keras model through a traced tf.function instead of model.predict.
+
+    model.predict builds a tf.data pipeline and callbacks on every call; a
+    tf.function with a fixed input signature is traced once and then reused
+    for every batch size.
+    """
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.model = model
+        self.input_shapes = [tuple(model_input.shape) for model_input in model.inputs]
+        input_signature = [tf.TensorSpec(shape=shape, dtype=tf.float32) for shape in self.input_shapes]
+
+        def forward(*inputs):
+            return model(list(inputs) if len(inputs) > 1 else inputs[0], training=False)
+
+        self._forward = tf.function(forward, input_signature=input_signature)
+
+    def predict(self, x):
+        """Return class probabilities; x is an array, or a list of arrays for multi-input models"""
+        inputs = x if isinstance(x, (list, tuple)) else [x]
+        batch = []
+        for value, shape in zip(inputs, self.input_shapes):
+            value = np.asarray(value, dtype=np.float32)
+            if value.ndim == len(shape) - 1:
+                value = value[np.newaxis, ...]
+            batch.append(value)
+        return self._forward(*batch).numpy()
+
+    def warmup(self, batch_sizes=(1, 8, 32)):
+        """Trace the graph and touch common batch sizes so the first real request is not slower"""
+        timings = {}
+        for batch_size in batch_sizes:
+            dummy = [np.zeros((batch_size,) + shape[1:], dtype=np.float32) for shape in self.input_shapes]
+            start = time.perf_counter()
+            self.predict(dummy if len(dummy) > 1 else dummy[0])
+            timings[batch_size] = (time.perf_counter() - start) * 1000.0
+        return timings
+
+
+def _load_tflite_interpreter_class():
+    """Prefer the standalone LiteRT / tflite_runtime interpreters over full TensorFlow"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+class TFLitePredictor:
+    """Run a converted .tflite model with the TFLite interpreter.
+
+    Float CPU kernels go through the XNNPACK delegate that the interpreter
+    applies by default; num_threads controls its thread pool. Quantized
+    int8 inputs and outputs are (de)quantized transparently.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        Interpreter = _load_tflite_interpreter_class()
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self._input_shapes = {d['index']: tuple(d['shape']) for d in self.input_details}
+        self._lock = threading.Lock()
+
+    def _match_input(self, value, used):
+        """Find the interpreter input whose per-sample shape matches value"""
+        for detail in self.input_details:
+            if detail['index'] not in used and tuple(detail['shape_signature'][1:]) == value.shape[1:]:
+                return detail
+        raise ValueError(f"No TFLite input matches shape {value.shape}")
+
+    def predict(self, x):
+        """Return class probabilities; x is an array, or a list of arrays for multi-input models"""
+        inputs = x if isinstance(x, (list, tuple)) else [x]
+
+        with self._lock:
+            feeds = []
+            used = set()
+            for value in inputs:
+                value = np.asarray(value, dtype=np.float32)
+                if len(inputs) == 1 and value.ndim == len(self.input_details[0]['shape_signature']) - 1:
+                    value = value[np.newaxis, ...]
+                detail = self._match_input(value, used)
+                used.add(detail['index'])
+                feeds.append((detail, value))
+
+            # Resize only when the batch size changes
+            resized = False
+            for detail, value in feeds:
+                if self._input_shapes[detail['index']] != value.shape:
+                    self.interpreter.resize_tensor_input(detail['index'], value.shape)
+                    self._input_shapes[detail['index']] = value.shape
+                    resized = True
+            if resized:
+                self.interpreter.allocate_tensors()
+
+            for detail, value in feeds:
+                if detail['dtype'] in (np.int8, np.uint8):
+                    scale, zero_point = detail['quantization']
+                    value = np.clip(np.round(value / scale + zero_point),
+                                    np.iinfo(detail['dtype']).min, np.iinfo(detail['dtype']).max)
+                self.interpreter.set_tensor(detail['index'], value.astype(detail['dtype']))
+
+            self.interpreter.invoke()
+
+            output_detail = self.output_details[0]
+            output = self.interpreter.get_tensor(output_detail['index'])
+            if output_detail['dtype'] in (np.int8, np.uint8):
+                scale, zero_point = output_detail['quantization']
+                output = (output.astype(np.float32) - zero_point) * scale
+            return np.array(output, dtype=np.float32)
+
+
+def load_predictor(backend, model_path, num_threads=None):
+    """Create a predictor for 'keras' (.h5), 'numpy' (.npz) or 'tflite' (.tflite) models"""
+    if backend == 'numpy':
+        return NumpyDNN.load(model_path)
+    if backend == 'tflite':
+        return TFLitePredictor(model_path, num_threads=num_threads)
+    if backend == 'keras':
+        from tensorflow.keras.models import load_model
+        return KerasPredictor(load_model(model_path))
+    raise ValueError(f"Unknown inference backend: {backend}")
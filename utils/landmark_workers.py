@@ -0,0 +1,331 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+LANDMARK_DIM = 99
+
+# Result codes written back by the workers
+STATUS_OK = 'ok'
+STATUS_NO_POSE = 'no_pose'
+STATUS_DECODE_ERROR = 'decode_error'
+STATUS_ERROR = 'error'
+
+
+class WorkerPoolFull(Exception):
+    """Raised when every frame slot is busy and the request should be rejected"""
+    pass
+
+
+class LandmarkExtractionError(RuntimeError):
+    """Raised when a worker failed on a frame or died while holding it"""
+    pass
+
+
+def _worker_main(worker_id, shm, num_slots, slot_bytes, tasks, results, max_sessions, idle_timeout, max_long_edge):
+    """Worker process: decode JPEG frames from shared memory and write back 99 landmark floats"""
+    from .image_ingest import decode_image
+    from .pose_utils import PoseUtils
+    from .pose_sessions import PoseSessionPool
+
+    frames = np.ndarray((num_slots, slot_bytes), dtype=np.uint8, buffer=shm.buf)
+    output = np.ndarray((num_slots, LANDMARK_DIM), dtype=np.float32, buffer=shm.buf,
+                        offset=num_slots * slot_bytes)
+
+    # Warm graphs: one static-image graph plus tracking graphs for sessions routed here
+    static_pose = PoseUtils()
+    sessions = PoseSessionPool(max_sessions=max_sessions, idle_timeout=idle_timeout)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        kind, payload = task
+        if kind == 'end_session':
+            sessions.end(payload)
+            continue
+
+        slot, nbytes, session_key = payload
+        try:
+            image, _ = decode_image(frames[slot, :nbytes], max_long_edge, to_rgb=True)
+            if image is None:
+                status = STATUS_DECODE_ERROR
+            else:
+                if session_key:
+                    with sessions.session(session_key) as session:
+                        landmarks, _ = session.pose_utils.extract_landmarks(image, is_rgb=True)
+                else:
+                    landmarks, _ = static_pose.extract_landmarks(image, is_rgb=True)
+
+                if landmarks is None:
+                    status = STATUS_NO_POSE
+                else:
+                    output[slot] = landmarks
+                    status = STATUS_OK
+        except Exception as e:
+            print(f"Landmark worker {worker_id} error: {e}")
+            status = STATUS_ERROR
+
+        results.send((slot, status))
+
+    static_pose.close()
+    shm.close()
+
+
+class _Frame:
+    """A frame handed to a worker, until its result is collected"""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.event = threading.Event()
+        self.status = None
+        self.abandoned = False  # the request timed out; free the slot when the worker is done with it
+
+
+class LandmarkWorkerPool:
+    """Run JPEG decode + MediaPipe landmark extraction in worker processes.
+
+    Frames are copied into fixed-size shared-memory slots and only the
+    99-float landmark vector comes back, so CPU-heavy frames no longer hold
+    the GIL of the web process. The number of slots bounds the frames in
+    flight; when all are busy for longer than queue_timeout the request is
+    rejected with WorkerPoolFull. Frames with a session key are always
+    routed to the same worker so its tracking-mode graph can be reused.
+    A worker that dies is restarted, and the frames it held fail with
+    STATUS_ERROR so their slots are not lost.
+    """
+
+    def __init__(self, num_workers=2, queue_size=8, slot_bytes=4 * 1024 * 1024, queue_timeout=0.05,
+                 max_sessions=32, idle_timeout=60, max_long_edge=640):
+        self.num_workers = num_workers
+        self.num_slots = max(queue_size, num_workers)
+        self.slot_bytes = slot_bytes
+        self.queue_timeout = queue_timeout
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_long_edge = max_long_edge
+
+        # Workers are spawned, never forked: a dead worker is replaced while TensorFlow and the batcher
+        # thread are running, and forking a multi-threaded process can deadlock the child. Queues and
+        # pipes must come from the same context. A spawned worker re-imports the launching script's
+        # module-level code, but not its __main__ block, which is why app.py opens its database
+        # connection, caches and background threads in init_services() under __main__.
+        self._ctx = mp.get_context('spawn')
+
+        self._shm = shared_memory.SharedMemory(
+            create=True,
+            size=self.num_slots * (slot_bytes + LANDMARK_DIM * np.dtype(np.float32).itemsize)
+        )
+        self._frames = np.ndarray((self.num_slots, slot_bytes), dtype=np.uint8, buffer=self._shm.buf)
+        self._output = np.ndarray((self.num_slots, LANDMARK_DIM), dtype=np.float32, buffer=self._shm.buf,
+                                  offset=self.num_slots * slot_bytes)
+
+        self._free_slots = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+
+        self._lock = threading.Lock()
+        self._pending = {}  # slot -> _Frame
+        self._in_flight = [0] * num_workers
+        # One result pipe per worker: a worker killed mid-write only breaks its own pipe,
+        # where a shared queue would be left with its write lock held by the dead process
+        self._results = [None] * num_workers
+        self._task_queues = [self._ctx.Queue() for _ in range(num_workers)]
+        self._workers = [None] * num_workers
+        self._running = False
+
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.restarted = 0
+
+    def _start_worker(self, worker_id):
+        reader, writer = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._shm, self.num_slots, self.slot_bytes, self._task_queues[worker_id],
+                  writer, self.max_sessions, self.idle_timeout, self.max_long_edge),
+            name=f'landmark-worker-{worker_id}',
+            daemon=True
+        )
+        process.start()
+        # Only the worker holds the write end now, so the reader sees EOF as soon as it dies
+        writer.close()
+        self._results[worker_id] = reader
+        self._workers[worker_id] = process
+
+    def start(self):
+        """Start the worker processes and the result dispatcher thread"""
+        for worker_id in range(self.num_workers):
+            self._start_worker(worker_id)
+        self._running = True
+        self._dispatcher = threading.Thread(target=self._dispatch_results, name='landmark-dispatcher', daemon=True)
+        self._dispatcher.start()
+        print(f"Started {self.num_workers} landmark worker processes with {self.num_slots} frame slots")
+        return self
+
+    def _dispatch_results(self):
+        """Hand worker results to waiting requests and recycle slots"""
+        while self._running:
+            readers = {reader: worker_id for worker_id, reader in enumerate(self._results)}
+            dead = []
+            for reader in wait(list(readers), timeout=1.0):
+                worker_id = readers[reader]
+                try:
+                    slot, status = reader.recv()
+                except (EOFError, OSError):
+                    dead.append(worker_id)
+                    continue
+                self._deliver(worker_id, slot, status)
+
+            # Checked on every pass, so a crashed worker is noticed under steady load too
+            for worker_id, process in enumerate(self._workers):
+                if worker_id not in dead and not process.is_alive():
+                    dead.append(worker_id)
+            for worker_id in dead:
+                if self._running:
+                    self._restart_worker(worker_id)
+
+    def _deliver(self, worker_id, slot, status):
+        with self._lock:
+            frame = self._pending.get(slot)
+            if frame is None or frame.worker_id != worker_id or frame.status is not None:
+                return
+            self._in_flight[worker_id] -= 1
+            self.completed += 1
+            frame.status = status
+            if frame.abandoned:
+                del self._pending[slot]
+
+        if frame.abandoned:
+            # The request gave up waiting; the slot is only reusable now
+            self._free_slots.put(slot)
+        else:
+            frame.event.set()
+
+    def _restart_worker(self, worker_id):
+        """Fail the frames of a dead worker, free their slots and start a replacement"""
+        process = self._workers[worker_id]
+        process.join(timeout=1.0)
+        print(f"Landmark worker {worker_id} exited (code {process.exitcode}), restarting")
+        self._results[worker_id].close()
+
+        freed, failed = [], []
+        with self._lock:
+            for slot, frame in list(self._pending.items()):
+                if frame.worker_id != worker_id or frame.status is not None:
+                    continue
+                frame.status = STATUS_ERROR
+                if frame.abandoned:
+                    del self._pending[slot]
+                    freed.append(slot)
+                else:
+                    failed.append(frame)
+            self._in_flight[worker_id] = 0
+            # Tasks still queued for the dead worker belong to the frames failed above
+            self._task_queues[worker_id].cancel_join_thread()
+            self._task_queues[worker_id] = self._ctx.Queue()
+            self.restarted += 1
+            self._start_worker(worker_id)
+
+        for slot in freed:
+            self._free_slots.put(slot)
+        for frame in failed:
+            frame.event.set()
+
+    def _pick_worker(self, session_key):
+        if session_key:
+            return zlib.crc32(session_key.encode('utf-8')) % self.num_workers
+        return min(range(self.num_workers), key=lambda worker_id: self._in_flight[worker_id])
+
+    def extract(self, file_bytes, session_key=None, timeout=10.0):
+        """Return the 99-float landmark vector for an encoded image, or None when no pose is found.
+
+        Raises WorkerPoolFull when no slot frees up within queue_timeout,
+        ValueError for oversized or undecodable frames, TimeoutError when
+        the worker does not answer in time and LandmarkExtractionError when
+        the worker failed on the frame or died.
+        """
+        nbytes = len(file_bytes)
+        if nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {nbytes} bytes exceeds the {self.slot_bytes}-byte slot size")
+
+        try:
+            slot = self._free_slots.get(timeout=self.queue_timeout) if self.queue_timeout else self._free_slots.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.rejected += 1
+            raise WorkerPoolFull("All landmark workers are busy")
+
+        self._frames[slot, :nbytes] = np.frombuffer(file_bytes, dtype=np.uint8)
+
+        with self._lock:
+            worker_id = self._pick_worker(session_key)
+            frame = _Frame(worker_id)
+            self._pending[slot] = frame
+            self._in_flight[worker_id] += 1
+            # Under the lock, so a restart cannot swap the worker's queue between picking and queueing
+            self._task_queues[worker_id].put(('frame', (slot, nbytes, session_key)))
+
+        if not frame.event.wait(timeout):
+            with self._lock:
+                if frame.status is None:
+                    # Keep the slot reserved until the worker finishes with it (or is reaped)
+                    frame.abandoned = True
+                    self.timed_out += 1
+                    raise TimeoutError("Landmark worker did not respond in time")
+
+        status = frame.status
+        landmarks = self._output[slot].copy() if status == STATUS_OK else None
+        with self._lock:
+            self._pending.pop(slot, None)
+        self._free_slots.put(slot)
+
+        if status == STATUS_DECODE_ERROR:
+            raise ValueError("Could not read image")
+        if status == STATUS_ERROR:
+            raise LandmarkExtractionError("Landmark extraction failed")
+        return landmarks
+
+    def end_session(self, session_key):
+        """Release the tracker that a worker holds for session_key"""
+        with self._lock:
+            worker_id = self._pick_worker(session_key)
+            self._task_queues[worker_id].put(('end_session', session_key))
+
+    def stats(self):
+        with self._lock:
+            in_flight = list(self._in_flight)
+            stats = {
+                'workers': self.num_workers,
+                'alive_workers': sum(1 for p in self._workers if p is not None and p.is_alive()),
+                'frame_slots': self.num_slots,
+                'free_slots': self._free_slots.qsize(),
+                'in_flight_per_worker': in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'restarted': self.restarted
+            }
+        return stats
+
+    def close(self):
+        """Stop workers and release the shared memory"""
+        self._running = False
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        deadline = time.monotonic() + 5
+        for process in self._workers:
+            if process is not None:
+                process.join(timeout=max(0.0, deadline - time.monotonic()))
+                if process.is_alive():
+                    process.terminate()
+        self._shm.close()
+        self._shm.unlink()
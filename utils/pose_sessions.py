@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from .pose_utils import PoseUtils
+
+GATE_COUNTERS = ('gate_hits', 'gate_misses', 'saved_inference_ms')
+
+
+def landmark_motion(previous, current):
+    """Mean 2D joint displacement between two 99-float landmark vectors, relative to the pose's size"""
+    previous_xy = np.asarray(previous, dtype=np.float32).reshape(-1, 3)[:, :2]
+    current_xy = np.asarray(current, dtype=np.float32).reshape(-1, 3)[:, :2]
+    extent = previous_xy.max(axis=0) - previous_xy.min(axis=0)
+    scale = max(float(np.hypot(extent[0], extent[1])), 1e-6)
+    return float(np.linalg.norm(current_xy - previous_xy, axis=1).mean() / scale)
+
+
+class PoseSession:
+    """Tracking state for one webcam session"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self._pose_utils = None
+        self.state = None  # PoseStateEngine, attached by the app on the first prediction
+        self.last_logged_hold = None  # hold_id of the last hold logged from the state engine
+
+        # Motion gate: last classified landmarks and the prediction made for them
+        self.last_landmarks = None
+        self.last_prediction = None
+        self.reuse_count = 0
+        self.model_calls = 0
+        self.inference_ms = 0.0  # running mean forward-pass time of those calls
+        self.gate_hits = 0
+        self.gate_misses = 0
+        self.saved_inference_ms = 0.0
+        self.lock = threading.Lock()
+        self.created_at = time.monotonic()
+        self.last_seen = self.created_at
+        self.frames = 0
+        self.closed = False
+
+    @property
+    def pose_utils(self):
+        """Tracking-mode MediaPipe graph, created on first use"""
+        if self._pose_utils is None:
+            self._pose_utils = PoseUtils(static_image_mode=False)
+        return self._pose_utils
+
+    def cached_prediction(self, landmarks, threshold, max_reuse):
+        """Return the last prediction if the pose has barely moved since it was made, else None"""
+        if self.last_landmarks is not None and self.reuse_count < max_reuse:
+            if landmark_motion(self.last_landmarks, landmarks) < threshold:
+                self.reuse_count += 1
+                self.gate_hits += 1
+                self.saved_inference_ms += self.inference_ms
+                return self.last_prediction
+        self.gate_misses += 1
+        return None
+
+    def remember_prediction(self, landmarks, prediction, forward_ms):
+        """Store a fresh prediction as the reference for the motion gate.
+
+        forward_ms is the model's forward-pass time for it (not the wait for a batch), which is
+        what each later gate hit is counted as saving.
+        """
+        self.last_landmarks = np.array(landmarks, dtype=np.float32)
+        self.last_prediction = prediction
+        self.reuse_count = 0
+        self.model_calls += 1
+        self.inference_ms += (forward_ms - self.inference_ms) / self.model_calls
+
+    def close(self):
+        """Release the session's MediaPipe graph"""
+        if not self.closed:
+            self.closed = True
+            if self._pose_utils is not None:
+                self._pose_utils.close()
+
+
+class PoseSessionPool:
+    """One tracking-mode MediaPipe Pose per webcam session.
+
+    Consecutive frames from the same session reuse MediaPipe's ROI tracking
+    instead of re-running the person detector. Sessions idle for longer than
+    idle_timeout seconds are evicted, and at most max_sessions trackers are
+    kept alive (least recently used first out).
+    """
+
+    def __init__(self, max_sessions=32, idle_timeout=60):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+        self._retired_gate = dict.fromkeys(GATE_COUNTERS, 0)
+
+    def _pop_expired(self, now):
+        """Remove idle and over-capacity sessions; caller holds self._lock"""
+        expired = []
+        # Sessions are kept in least-recently-used order, so idle ones sit at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen < self.idle_timeout:
+                break
+            expired.append(self._sessions.popitem(last=False)[1])
+            self.evicted_idle += 1
+
+        while len(self._sessions) > self.max_sessions:
+            expired.append(self._sessions.popitem(last=False)[1])
+            self.evicted_capacity += 1
+
+        return expired
+
+    def _close_all(self, sessions):
+        # Wait for any in-flight frame before tearing the graph down
+        for session in sessions:
+            with session.lock:
+                session.close()
+            with self._lock:
+                for name in GATE_COUNTERS:
+                    self._retired_gate[name] += getattr(session, name)
+
+    def get(self, session_id):
+        """Return the tracker for session_id, creating it if needed"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = PoseSession(session_id)
+                self._sessions[session_id] = session
+                self.created += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            expired = self._pop_expired(now)
+
+        self._close_all(expired)
+        return session
+
+    @contextmanager
+    def session(self, session_id):
+        """Check out a session's tracker for the duration of one frame"""
+        while True:
+            session = self.get(session_id)
+            session.lock.acquire()
+            if not session.closed:
+                break
+            # Evicted between lookup and lock - start over with a fresh tracker
+            session.lock.release()
+
+        try:
+            session.frames += 1
+            yield session
+        finally:
+            session.last_seen = time.monotonic()
+            session.lock.release()
+
+    def end(self, session_id):
+        """Drop a session's tracker (e.g. when the user ends the webcam session) and return it"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._close_all([session])
+        return session
+
+    def evict_idle(self):
+        """Evict idle sessions without creating a new one"""
+        with self._lock:
+            expired = self._pop_expired(time.monotonic())
+        self._close_all(expired)
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            active = len(self._sessions)
+            frames = sum(session.frames for session in self._sessions.values())
+            gate = {name: self._retired_gate[name] + sum(getattr(session, name) for session in self._sessions.values())
+                    for name in GATE_COUNTERS}
+        checked = gate['gate_hits'] + gate['gate_misses']
+        return {
+            'active_sessions': active,
+            'max_sessions': self.max_sessions,
+            'idle_timeout_seconds': self.idle_timeout,
+            'frames_in_active_sessions': frames,
+            'created': self.created,
+            'evicted_idle': self.evicted_idle,
+            'evicted_capacity': self.evicted_capacity,
+            'motion_gate': {
+                'hits': gate['gate_hits'],
+                'misses': gate['gate_misses'],
+                'hit_rate': gate['gate_hits'] / checked if checked else 0.0,
+                'saved_inference_ms': round(gate['saved_inference_ms'], 2)
+            }
+        }
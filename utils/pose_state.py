@@ -0,0 +1,143 @@
+import time
+
+import numpy as np
+
+
+class PoseStateEngine:
+    """Smooth per-frame class probabilities and track which pose a session is holding.
+
+    The last `window` probability vectors are kept in a ring buffer and
+    smoothed either with an exponential moving average ('ema') or by
+    majority vote over the window ('majority'). Hysteresis keeps the held
+    pose stable: a pose is entered only after its smoothed score reaches
+    enter_threshold for min_frames consecutive frames, and is left only
+    when its score drops below exit_threshold or another pose enters.
+    """
+
+    def __init__(self, num_classes, window=8, method='ema', alpha=0.3,
+                 enter_threshold=0.85, exit_threshold=0.6, min_frames=2):
+        if method not in ('ema', 'majority'):
+            raise ValueError(f"Unknown smoothing method '{method}'")
+
+        self.num_classes = num_classes
+        self.window = window
+        self.method = method
+        self.alpha = alpha
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.min_frames = min_frames
+
+        self._history = np.zeros((window, num_classes), dtype=np.float32)
+        self._count = 0
+        self._ema = None
+
+        self.current = None          # class index of the held pose
+        self.started_at = None
+        self.hold_id = 0             # increases with every pose entered, identifies each hold
+        self._confidence_sum = 0.0
+        self._confidence_frames = 0
+
+        self._candidate = None
+        self._candidate_frames = 0
+
+        self.transitions = 0
+
+    def smoothed(self):
+        """Return the current smoothed probability vector"""
+        if self._count == 0:
+            return np.zeros(self.num_classes, dtype=np.float32)
+        if self.method == 'ema':
+            return self._ema
+
+        filled = self._history[:min(self._count, self.window)]
+        votes = np.bincount(filled.argmax(axis=1), minlength=self.num_classes)
+        return (votes / len(filled)).astype(np.float32)
+
+    def hold_seconds(self, now=None):
+        if self.current is None:
+            return 0.0
+        return (now if now is not None else time.monotonic()) - self.started_at
+
+    def _finish_current(self, now):
+        """Close the held pose and return its summary"""
+        completed = {
+            'hold_id': self.hold_id,
+            'pose_index': self.current,
+            'duration_seconds': round(self.hold_seconds(now), 2),
+            'avg_confidence': self._confidence_sum / max(self._confidence_frames, 1)
+        }
+        self.current = None
+        self.started_at = None
+        self._confidence_sum = 0.0
+        self._confidence_frames = 0
+        return completed
+
+    def _enter(self, pose_index, now):
+        self.current = pose_index
+        self.started_at = now
+        self.hold_id += 1
+        self._confidence_sum = 0.0
+        self._confidence_frames = 0
+        self._candidate = None
+        self._candidate_frames = 0
+
+    def update(self, probabilities, now=None):
+        """Add one frame's class probabilities and return the resulting state.
+
+        The returned dict has the held pose index (or None), its smoothed
+        score, whether the pose is stable, the hold time in seconds, and an
+        event: 'start', 'transition', 'end' or None. 'completed' summarises
+        the pose that was just left, if any, with the hold_id of that hold.
+        """
+        now = now if now is not None else time.monotonic()
+        probabilities = np.asarray(probabilities, dtype=np.float32)
+
+        self._history[self._count % self.window] = probabilities
+        self._count += 1
+        if self._ema is None:
+            self._ema = probabilities.copy()
+        else:
+            self._ema += self.alpha * (probabilities - self._ema)
+
+        smoothed = self.smoothed()
+        top = int(smoothed.argmax())
+        top_score = float(smoothed[top])
+
+        # Count consecutive frames a different pose has been above the entry threshold
+        if top != self.current and top_score >= self.enter_threshold:
+            if top == self._candidate:
+                self._candidate_frames += 1
+            else:
+                self._candidate, self._candidate_frames = top, 1
+        else:
+            self._candidate, self._candidate_frames = None, 0
+
+        event, completed = None, None
+        if self._candidate is not None and self._candidate_frames >= self.min_frames:
+            event = 'start' if self.current is None else 'transition'
+            if self.current is not None:
+                completed = self._finish_current(now)
+                self.transitions += 1
+            self._enter(self._candidate, now)
+        elif self.current is not None and smoothed[self.current] < self.exit_threshold:
+            event = 'end'
+            completed = self._finish_current(now)
+
+        if self.current is not None:
+            self._confidence_sum += float(probabilities[self.current])
+            self._confidence_frames += 1
+
+        return {
+            'pose_index': self.current,
+            'score': float(smoothed[self.current]) if self.current is not None else top_score,
+            'stable': self.current is not None and self._candidate is None,
+            'hold_seconds': round(self.hold_seconds(now), 2),
+            'event': event,
+            'completed': completed
+        }
+
+    def finish(self, now=None):
+        """End the session: return the summary of the pose still held, if any"""
+        if self.current is None:
+            return None
+        return self._finish_current(now if now is not None else time.monotonic())
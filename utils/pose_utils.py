@@ -1,18 +1,32 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import cv2
 import numpy as np
 import mediapipe as mp
 
 class PoseUtils:
-    def __init__(self):
+    def __init__(self, static_image_mode=True, min_detection_confidence=0.5, min_tracking_confidence=0.5):
         # Initialize MediaPipe Pose
+        # static_image_mode=False runs the person detector once and then tracks the ROI across frames
         mp_pose = mp.solutions.pose
-        self.pose = mp_pose.Pose(static_image_mode=True, min_detection_confidence=0.5)
+        self.pose = mp_pose.Pose(static_image_mode=static_image_mode,
+                                 min_detection_confidence=min_detection_confidence,
+                                 min_tracking_confidence=min_tracking_confidence)
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
     
-    def extract_landmarks(self, image):
-        """Extract pose landmarks from image"""
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    def close(self):
+        """Release the MediaPipe graph"""
+        self.pose.close()
+    
+    def extract_landmarks(self, image, is_rgb=False):
+        """Extract pose landmarks from image (BGR unless is_rgb=True)"""
+        image_rgb = image if is_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         results = self.pose.process(image_rgb)
         
         if not results.pose_landmarks:
@@ -49,4 +63,89 @@ class PoseUtils:
             
         img = cv2.resize(img, target_size)
         img = img / 255.0  # Normalize to [0,1]
-        return img
\ No newline at end of file
+        return img
+
+
+class PoseUtilsPool:
+    """Bounded pool of PoseUtils instances for concurrent request threads.
+
+    A MediaPipe graph must not be called from two threads at once, so each
+    request checks out its own instance. Instances are created lazily up to
+    size (default: one per CPU core); further callers wait in the queue.
+    """
+
+    def __init__(self, size=None, **pose_kwargs):
+        self.size = size or os.cpu_count() or 1
+        self.pose_kwargs = pose_kwargs
+        self._available = queue.LifoQueue()  # LIFO keeps recently used graphs warm
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+
+        # Queue-wait metrics
+        self._checkouts = 0
+        self._waited = 0
+        self._recent_waits = deque(maxlen=1000)
+
+    def _acquire(self, timeout):
+        try:
+            return self._available.get_nowait(), False
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                return PoseUtils(**self.pose_kwargs), False
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._available.get(timeout=timeout), True
+        except queue.Empty:
+            raise TimeoutError("Timed out waiting for a free pose estimator")
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Borrow a PoseUtils instance for the duration of the with-block"""
+        start = time.perf_counter()
+        instance, waited = self._acquire(timeout)
+        wait_ms = (time.perf_counter() - start) * 1000.0
+
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            if waited:
+                self._waited += 1
+            self._recent_waits.append(wait_ms)
+
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._available.put(instance)
+
+    def stats(self):
+        with self._lock:
+            waits = list(self._recent_waits)
+            stats = {
+                'size': self.size,
+                'created': self._created,
+                'in_use': self._in_use,
+                'checkouts': self._checkouts,
+                'checkouts_that_waited': self._waited
+            }
+        if waits:
+            stats['queue_wait_ms'] = {
+                'mean': float(np.mean(waits)),
+                'p50': float(np.percentile(waits, 50)),
+                'p99': float(np.percentile(waits, 99)),
+                'max': float(np.max(waits))
+            }
+        return stats
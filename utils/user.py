@@ -49,6 +49,11 @@ class User(UserMixin):
             "timestamps": {
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
+            },
+            # Maintained by log_user_activity (UTC dates)
+            "activity": {
+                "current_streak": 0,
+                "last_active_date": None
             }
         }
         
@@ -134,88 +139,97 @@ def log_user_activity(user_id, pose_name, confidence, session_id=None, duration_
         }
         
         result = db.db.user_activities.insert_one(activity_data)
+        update_user_streak(user_id)
         return str(result.inserted_id)
     except Exception as e:
         print(f"Error logging user activity: {e}")
         return None
 
+def activity_stats_pipeline(user_id, days=30, now=None):
+    """Aggregation computing every dashboard statistic in one round trip.
+    
+    One $facet over the user's recent activities yields the totals, per-day
+    counts for the last 7 days (UTC dates), the top asanas and the recent
+    sessions together.
+    """
+    now = now or datetime.utcnow()
+    start_date = now - timedelta(days=days)
+    week_start = (now - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
+    in_period = {'$match': {'timestamp': {'$gte': start_date}}}
+    
+    return [
+        {'$match': {
+            'user_id': ObjectId(user_id),
+            'timestamp': {'$gte': min(start_date, week_start)}
+        }},
+        {'$facet': {
+            'totals': [
+                in_period,
+                {'$group': {
+                    '_id': None,
+                    'total_asanas': {'$sum': 1},
+                    'poses': {'$addToSet': '$pose_name'}
+                }},
+                {'$project': {'_id': 0, 'total_asanas': 1, 'unique_asanas': {'$size': '$poses'}}}
+            ],
+            'daily_activity': [
+                {'$match': {'timestamp': {'$gte': week_start}}},
+                {'$group': {
+                    '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$timestamp'}},
+                    'count': {'$sum': 1}
+                }}
+            ],
+            # Most practiced asanas
+            'top_asanas': [
+                in_period,
+                {'$group': {
+                    '_id': '$pose_name',
+                    'count': {'$sum': 1},
+                    'traditional_name': {'$first': '$traditional_name'},
+                    'last_practiced': {'$max': '$timestamp'}
+                }},
+                {'$sort': {'count': -1}},
+                {'$limit': 5}
+            ],
+            # Session statistics
+            'recent_sessions': [
+                in_period,
+                {'$group': {
+                    '_id': '$session_id',
+                    'asanas_count': {'$sum': 1},
+                    'total_duration': {'$sum': '$duration_seconds'},
+                    'session_date': {'$first': '$timestamp'}
+                }},
+                {'$sort': {'session_date': -1}},
+                {'$limit': 10}
+            ]
+        }}
+    ]
+
 def get_user_activity_stats(user_id, days=30):
     """Get user activity statistics for the last N days"""
     try:
-        start_date = datetime.utcnow() - timedelta(days=days)
+        now = datetime.utcnow()
+        result = next(db.db.user_activities.aggregate(activity_stats_pipeline(user_id, days, now)))
+        totals = result['totals'][0] if result['totals'] else {'total_asanas': 0, 'unique_asanas': 0}
         
-        # Total asanas performed
-        total_asanas = db.db.user_activities.count_documents({
-            'user_id': ObjectId(user_id),
-            'timestamp': {'$gte': start_date}
-        })
-        
-        # Unique asanas performed
-        unique_asanas = db.db.user_activities.distinct('pose_name', {
-            'user_id': ObjectId(user_id),
-            'timestamp': {'$gte': start_date}
-        })
-        
-        # Daily activity (last 7 days)
+        # Daily activity (last 7 days), including days without any
+        day_counts = {bucket['_id']: bucket['count'] for bucket in result['daily_activity']}
         daily_activity = []
         for i in range(7):
-            day = datetime.utcnow() - timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            day_count = db.db.user_activities.count_documents({
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': day_start, '$lte': day_end}
-            })
-            
+            day = now - timedelta(days=i)
             daily_activity.append({
                 'date': day.strftime('%Y-%m-%d'),
                 'day_name': day.strftime('%a'),
-                'count': day_count
+                'count': day_counts.get(day.strftime('%Y-%m-%d'), 0)
             })
         
-        # Most practiced asanas
-        pipeline = [
-            {'$match': {
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': start_date}
-            }},
-            {'$group': {
-                '_id': '$pose_name',
-                'count': {'$sum': 1},
-                'traditional_name': {'$first': '$traditional_name'},
-                'last_practiced': {'$max': '$timestamp'}
-            }},
-            {'$sort': {'count': -1}},
-            {'$limit': 5}
-        ]
-        
-        top_asanas = list(db.db.user_activities.aggregate(pipeline))
-        
-        # Session statistics
-        session_stats = db.db.user_activities.aggregate([
-            {'$match': {
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': start_date}
-            }},
-            {'$group': {
-                '_id': '$session_id',
-                'asanas_count': {'$sum': 1},
-                'total_duration': {'$sum': '$duration_seconds'},
-                'session_date': {'$first': '$timestamp'}
-            }},
-            {'$sort': {'session_date': -1}},
-            {'$limit': 10}
-        ])
-        
-        sessions = list(session_stats)
-        
         return {
-            'total_asanas': total_asanas,
-            'unique_asanas': len(unique_asanas),
+            'total_asanas': totals['total_asanas'],
+            'unique_asanas': totals['unique_asanas'],
             'daily_activity': list(reversed(daily_activity)),
-            'top_asanas': top_asanas,
-            'recent_sessions': sessions,
+            'top_asanas': result['top_asanas'],
+            'recent_sessions': result['recent_sessions'],
             'period_days': days
         }
         
@@ -230,29 +244,66 @@ def get_user_activity_stats(user_id, days=30):
             'period_days': days
         }
 
+def update_user_streak(user_id):
+    """Advance the streak stored on the user document for activity today (one atomic update)"""
+    today = datetime.utcnow().strftime('%Y-%m-%d')
+    yesterday = (datetime.utcnow() - timedelta(days=1)).strftime('%Y-%m-%d')
+    # Users created before streaks were stored have no activity fields yet; get_user_streak backfills them from history
+    try:
+        db.db.users.update_one(
+            {'_id': ObjectId(user_id), 'activity.current_streak': {'$exists': True}},
+            [{'$set': {
+                'activity.current_streak': {'$switch': {
+                    'branches': [
+                        {'case': {'$eq': ['$activity.last_active_date', today]}, 'then': '$activity.current_streak'},
+                        {'case': {'$eq': ['$activity.last_active_date', yesterday]},
+                         'then': {'$add': ['$activity.current_streak', 1]}}
+                    ],
+                    'default': 1
+                }},
+                'activity.last_active_date': today
+            }}]
+        )
+    except Exception as e:
+        print(f"Error updating user streak: {e}")
+
+def compute_streak_from_history(user_id):
+    """Return (last active UTC date, length of the run of consecutive active days ending on it) from all activity"""
+    dates = [doc['_id'] for doc in db.db.user_activities.aggregate([
+        {'$match': {'user_id': ObjectId(user_id)}},
+        {'$group': {'_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$timestamp'}}}},
+        {'$sort': {'_id': -1}}
+    ])]
+    if not dates:
+        return None, 0
+    
+    streak = 0
+    expected = datetime.strptime(dates[0], '%Y-%m-%d')
+    for date in dates:
+        if date != expected.strftime('%Y-%m-%d'):
+            break
+        streak += 1
+        expected -= timedelta(days=1)
+    return dates[0], streak
+
 def get_user_streak(user_id):
-    """Calculate user's current streak of consecutive days with activity"""
+    """Calculate user's current streak of consecutive days with activity, ending today"""
     try:
-        # Check last 30 days for streak calculation
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        streak = 0
+        today = datetime.utcnow().strftime('%Y-%m-%d')
+        user_doc = db.db.users.find_one({'_id': ObjectId(user_id)}, {'activity': 1})
+        activity = (user_doc or {}).get('activity')
         
-        for i in range(30):
-            check_date = today - timedelta(days=i)
-            day_start = check_date
-            day_end = check_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            has_activity = db.db.user_activities.count_documents({
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': day_start, '$lte': day_end}
-            }) > 0
-            
-            if has_activity:
-                streak += 1
-            else:
-                break
+        if activity is None or 'current_streak' not in activity:
+            # Not maintained for this user yet: compute once from history and store it
+            last_active_date, streak = compute_streak_from_history(user_id)
+            db.db.users.update_one(
+                {'_id': ObjectId(user_id), 'activity.current_streak': {'$exists': False}},
+                {'$set': {'activity.current_streak': streak, 'activity.last_active_date': last_active_date}}
+            )
+        else:
+            last_active_date, streak = activity.get('last_active_date'), activity['current_streak']
         
-        return streak
+        return streak if last_active_date == today else 0
     except Exception as e:
         print(f"Error calculating streak: {e}")
         return 0
@@ -0,0 +1,221 @@
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'webm'}
+
+
+def read_video_info(path):
+    """Return (fps, frame_count) for a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video '{path}'")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, frame_count
+
+
+def iter_video_frames(path, start_frame=0, end_frame=None, stride=1, max_long_edge=640, prefetch=8):
+    """Yield (frame_index, rgb_frame) for every stride-th frame in [start_frame, end_frame).
+
+    Frames are read on a background thread so decoding overlaps with pose
+    estimation. Skipped frames are only grabbed, never decoded to pixels,
+    and the video is never held in memory beyond the prefetch queue.
+    """
+    frames = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def read():
+        cap = cv2.VideoCapture(path)
+        try:
+            if start_frame:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            index = start_frame
+            while not stop.is_set() and (end_frame is None or index < end_frame):
+                if not cap.grab():
+                    break
+                if (index - start_frame) % stride == 0:
+                    ok, frame = cap.retrieve()
+                    if not ok:
+                        break
+                    height, width = frame.shape[:2]
+                    if max_long_edge and max(height, width) > max_long_edge:
+                        scale = max_long_edge / max(height, width)
+                        frame = cv2.resize(frame, (round(width * scale), round(height * scale)),
+                                           interpolation=cv2.INTER_LINEAR)
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+                    frames.put((index, frame))
+                index += 1
+        finally:
+            cap.release()
+            frames.put(None)
+
+    reader = threading.Thread(target=read, name='video-reader', daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        stop.set()
+        # Unblock the reader if it is waiting on a full queue
+        while reader.is_alive():
+            try:
+                frames.get_nowait()
+            except queue.Empty:
+                reader.join(timeout=0.1)
+
+
+def track_video_range(path, start_frame=0, end_frame=None, stride=1, max_long_edge=640):
+    """Run tracking-mode MediaPipe over a frame range; returns (frame_indices, landmarks or None per frame)"""
+    from .pose_utils import PoseUtils
+
+    pose_utils = PoseUtils(static_image_mode=False)
+    indices, landmarks = [], []
+    try:
+        for index, frame in iter_video_frames(path, start_frame, end_frame, stride, max_long_edge):
+            frame_landmarks, _ = pose_utils.extract_landmarks(frame, is_rgb=True)
+            indices.append(index)
+            landmarks.append(frame_landmarks.astype(np.float32) if frame_landmarks is not None else None)
+    finally:
+        pose_utils.close()
+    return indices, landmarks
+
+
+def _track_range_worker(args):
+    return track_video_range(*args)
+
+
+def classify_landmarks_batched(landmarks, predict_fn, batch_size=64):
+    """Classify a list of landmark vectors (None entries skipped) in batches; returns (class_idx, confidence) per entry"""
+    results = [None] * len(landmarks)
+    present = [i for i, lm in enumerate(landmarks) if lm is not None]
+    for offset in range(0, len(present), batch_size):
+        chunk = present[offset:offset + batch_size]
+        probabilities = np.asarray(predict_fn(np.stack([landmarks[i] for i in chunk])))
+        for i, probs in zip(chunk, probabilities):
+            class_idx = int(probs.argmax())
+            results[i] = (class_idx, float(probs[class_idx]))
+    return results
+
+
+def build_timeline(frame_indices, predictions, labels, fps, stride=1, min_confidence=0.5, min_segment_seconds=1.0):
+    """Compress per-frame predictions into (pose, start, end, mean confidence) segments.
+
+    Frames without a pose or below min_confidence count as pose None. Runs
+    shorter than min_segment_seconds are treated as flicker and absorbed by
+    their neighbours before equal neighbours are merged.
+    """
+    frame_seconds = stride / fps
+    runs = []
+    for index, prediction in zip(frame_indices, predictions):
+        if prediction is not None and prediction[1] >= min_confidence:
+            pose, confidence = str(labels[prediction[0]]), prediction[1]
+        else:
+            pose, confidence = None, None
+
+        start = index / fps
+        if runs and runs[-1]['pose'] == pose:
+            run = runs[-1]
+        else:
+            run = {'pose': pose, 'start': start, 'end': start, 'confidences': [], 'frames': 0}
+            runs.append(run)
+        run['end'] = start + frame_seconds
+        run['frames'] += 1
+        if confidence is not None:
+            run['confidences'].append(confidence)
+
+    if not runs:
+        return []
+
+    # Drop flicker, then merge what is left
+    timeline_start = runs[0]['start']
+    if len(runs) > 1:
+        runs = [run for run in runs if run['end'] - run['start'] >= min_segment_seconds] or runs
+    segments = []
+    for run in runs:
+        if segments and segments[-1]['pose'] == run['pose']:
+            previous = segments[-1]
+            previous['end'] = run['end']
+            previous['frames'] += run['frames']
+            previous['confidences'].extend(run['confidences'])
+        elif segments:
+            # Close the gap left by dropped flicker
+            segments[-1]['end'] = run['start']
+            segments.append(run)
+        else:
+            segments.append(run)
+    segments[0]['start'] = timeline_start
+
+    return [{
+        'pose': segment['pose'],
+        'start': round(segment['start'], 3),
+        'end': round(segment['end'], 3),
+        'duration': round(segment['end'] - segment['start'], 3),
+        'mean_confidence': round(float(np.mean(segment['confidences'])), 4) if segment['confidences'] else None,
+        'frames': segment['frames']
+    } for segment in segments]
+
+
+def sampled_frame_count(frame_count, stride=1):
+    """Number of frames analyze_video looks at for a video of frame_count frames"""
+    return -(-frame_count // stride)
+
+
+def analyze_video(path, predict_fn, labels, stride=1, workers=1, batch_size=64, max_long_edge=640,
+                  min_confidence=0.5, min_segment_seconds=1.0, max_frames=None):
+    """Classify the poses in a video file and return a timeline with throughput figures.
+
+    With workers > 1 the video is split into contiguous frame ranges, each
+    tracked by its own process (MediaPipe re-detects once at every range
+    start); classification always runs in the calling process in batches.
+    Analysis stops after max_frames sampled frames even if the container
+    reported a shorter length.
+    """
+    fps, frame_count = read_video_info(path)
+    end_frame = max_frames * stride if max_frames else None
+    if end_frame is not None and frame_count > 0:
+        frame_count = min(frame_count, end_frame)
+    start = time.perf_counter()
+
+    if workers > 1 and frame_count > workers * stride:
+        # Range boundaries on the stride grid so sampling matches a single-process run
+        step = -(-frame_count // (workers * stride)) * stride
+        ranges = [(path, begin, min(begin + step, frame_count), stride, max_long_edge)
+                  for begin in range(0, frame_count, step)]
+        use_fork = 'fork' in mp.get_all_start_methods() and 'tensorflow' not in sys.modules
+        with mp.get_context('fork' if use_fork else 'spawn').Pool(len(ranges)) as pool:
+            parts = pool.map(_track_range_worker, ranges)
+        frame_indices = [index for indices, _ in parts for index in indices]
+        landmarks = [lm for _, part in parts for lm in part]
+    else:
+        frame_indices, landmarks = track_video_range(path, 0, end_frame, stride, max_long_edge)
+
+    tracked = time.perf_counter()
+    predictions = classify_landmarks_batched(landmarks, predict_fn, batch_size)
+    elapsed = time.perf_counter() - start
+
+    video_seconds = (frame_indices[-1] + stride) / fps if frame_indices else 0.0
+    return {
+        'video': os.path.basename(path),
+        'fps': round(fps, 3),
+        'duration_seconds': round(video_seconds, 3),
+        'frames_sampled': len(frame_indices),
+        'frames_with_pose': sum(1 for lm in landmarks if lm is not None),
+        'stride': stride,
+        'workers': workers,
+        'processing_seconds': round(elapsed, 3),
+        'tracking_seconds': round(tracked - start, 3),
+        'processing_fps': round(len(frame_indices) / elapsed, 2) if elapsed else 0.0,
+        'realtime_factor': round(video_seconds / elapsed, 2) if elapsed else 0.0,
+        'segments': build_timeline(frame_indices, predictions, labels, fps, stride, min_confidence, min_segment_seconds)
+    }